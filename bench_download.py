@@ -0,0 +1,275 @@
+"""Download benchmark for CTLauncher.
+
+Serves a synthetic version (manifest, JAR, libraries, natives and assets) from a local HTTP
+server with optional latency, bandwidth cap and injected failures, then times cold and warm
+installs of it by running the launcher's headless "install" command against that server as
+a mirror. Example:
+
+    python bench_download.py --objects 3000 --latency 20 --failure-rate 0.05 --runs 3
+"""
+import os
+import sys
+import json
+import re
+import io
+import time
+import random
+import hashlib
+import zipfile
+import shutil
+import tempfile
+import platform
+import threading
+import subprocess
+import urllib.parse
+import http.server
+import argparse
+import contextlib
+import importlib.util
+
+LAUNCHER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ctlauncher0.2a.py")
+_spec = importlib.util.spec_from_file_location("ctlauncher", LAUNCHER_PATH)
+launcher = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(launcher)
+
+
+BENCH_VERSION = "bench-1.0"
+BENCH_HOST = "bench.invalid"  # synthetic upstream host, only ever reached through the mirror rewrite
+
+
+def build_benchmark_fixture(num_objects=3000, num_libraries=40, jar_size=4 * 1024 * 1024, seed=1):
+    """Build a synthetic version with its manifest, JAR, libraries, natives and assets.
+
+    Returns {mirror path: bytes}, laid out like a mirror (<host>/<path>) so the launcher can
+    reach it through MIRROR_BASE_URL. The same seed always produces the same files.
+    """
+    rnd = random.Random(seed)
+    files = {}
+    
+    def add(url, data):
+        files["/" + launcher.mirror_path(url)] = data
+        return {"url": url, "sha1": hashlib.sha1(data).hexdigest(), "size": len(data)}
+    
+    def jar(entries):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_ref:
+            for name, data in entries.items():
+                zip_ref.writestr(name, data)
+        return buffer.getvalue()
+    
+    objects = {}
+    for i in range(num_objects):
+        data = rnd.randbytes(rnd.randint(200, 16 * 1024))
+        obj_hash = hashlib.sha1(data).hexdigest()
+        files[f"/resources.download.minecraft.net/{obj_hash[:2]}/{obj_hash}"] = data
+        objects[f"minecraft/bench/object{i}.ogg"] = {"hash": obj_hash, "size": len(data)}
+    asset_index = add(f"https://{BENCH_HOST}/indexes/bench.json", json.dumps({"objects": objects}).encode())
+    asset_index["id"] = "bench"
+    
+    libraries = []
+    for i in range(num_libraries):
+        artifact = add(f"https://{BENCH_HOST}/libraries/bench/lib{i}/1.0/lib{i}-1.0.jar",
+                       jar({f"bench/lib{i}/Data.class": rnd.randbytes(rnd.randint(16, 512) * 1024)}))
+        artifact["path"] = f"bench/lib{i}/1.0/lib{i}-1.0.jar"
+        libraries.append({"name": f"bench:lib{i}:1.0", "downloads": {"artifact": artifact}})
+    for i in range(2):
+        classifiers, natives = {}, {}
+        for os_name in ("linux", "windows", "osx"):
+            native = add(f"https://{BENCH_HOST}/libraries/bench/native{i}/1.0/native{i}-1.0-natives-{os_name}.jar",
+                         jar({f"native{i}.bin": rnd.randbytes(256 * 1024), "META-INF/MANIFEST.MF": b"Manifest-Version: 1.0"}))
+            native["path"] = f"bench/native{i}/1.0/native{i}-1.0-natives-{os_name}.jar"
+            classifiers[f"natives-{os_name}"] = native
+            natives[os_name] = f"natives-{os_name}"
+        libraries.append({"name": f"bench:native{i}:1.0", "natives": natives, "extract": {"exclude": ["META-INF/"]},
+                          "downloads": {"classifiers": classifiers}})
+    
+    version = {
+        "id": BENCH_VERSION, "type": "release", "mainClass": "net.minecraft.client.main.Main",
+        "assetIndex": asset_index, "libraries": libraries, "javaVersion": {"majorVersion": 21},
+        "downloads": {"client": add(f"https://{BENCH_HOST}/versions/{BENCH_VERSION}/client.jar",
+                                    jar({"net/minecraft/client/main/Main.class": rnd.randbytes(jar_size)}))}
+    }
+    version_info = add(f"https://{BENCH_HOST}/versions/{BENCH_VERSION}.json", json.dumps(version).encode())
+    manifest = {"latest": {"release": BENCH_VERSION, "snapshot": BENCH_VERSION},
+                "versions": [{"id": BENCH_VERSION, "type": "release", "url": version_info["url"],
+                              "sha1": version_info["sha1"]}]}
+    files["/" + launcher.mirror_path(launcher.VERSION_MANIFEST_URL)] = json.dumps(manifest).encode()
+    return files
+
+
+class BenchmarkServer(http.server.ThreadingHTTPServer):
+    """Local HTTP stand-in for Mojang's servers with optional latency, bandwidth cap and failures.
+
+    latency is added before every response, bandwidth (bytes/s) caps each connection, and
+    failure_rate is the chance a request gets a 503 or is cut off halfway through its body;
+    the version manifest is exempt, since the launcher fetches it once without retrying.
+    Range requests are honoured so resumed downloads can be measured too.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, files, latency=0.0, bandwidth=0, failure_rate=0.0, seed=1):
+        super().__init__(("127.0.0.1", 0), BenchmarkRequestHandler)
+        self.files = files
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.reliable = {"/" + launcher.mirror_path(launcher.VERSION_MANIFEST_URL)}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.bytes_sent = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, requests=0, failures=0, sent=0):
+        """Add to the request, injected failure and body byte counters."""
+        with self.lock:
+            self.requests += requests
+            self.failures += failures
+            self.bytes_sent += sent
+
+    def roll_failure(self):
+        """Return None, "status" or "truncate" for the next request."""
+        with self.lock:
+            if self.random.random() >= self.failure_rate:
+                return None
+            return self.random.choice(("status", "truncate"))
+
+
+class BenchmarkRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves BenchmarkServer.files, applying its latency, bandwidth and failure settings."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count(requests=1)
+        if server.latency:
+            time.sleep(server.latency)
+        path = urllib.parse.urlsplit(self.path).path
+        data = server.files.get(path)
+        failure = server.roll_failure() if data is not None and path not in server.reliable else None
+        if data is None or failure == "status":
+            server.count(failures=int(failure == "status"))
+            self.send_response(404 if data is None else 503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        
+        start = 0
+        match = re.match(r"bytes=(\d+)-$", self.headers.get("Range", ""))
+        if match and int(match.group(1)) < len(data):
+            start = int(match.group(1))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", f'"{hashlib.sha1(data).hexdigest()}"')
+        self.end_headers()
+        
+        body = memoryview(data)[start:]
+        if failure == "truncate":
+            body = body[:len(body) // 2]
+        for offset in range(0, len(body), launcher.DOWNLOAD_CHUNK_SIZE):
+            chunk = body[offset:offset + launcher.DOWNLOAD_CHUNK_SIZE]
+            self.wfile.write(chunk)
+            server.count(sent=len(chunk))
+            if server.bandwidth:
+                time.sleep(len(chunk) / server.bandwidth)
+        if failure == "truncate":
+            server.count(failures=1)
+            self.close_connection = True
+
+
+def run_download_benchmark(num_objects=3000, num_libraries=40, jar_size=4 * 1024 * 1024, latency=0.0,
+                           bandwidth=0, failure_rate=0.0, runs=1, seed=1):
+    """Time the real install pipeline against a BenchmarkServer.
+
+    Each run installs the synthetic version cold (empty launcher directory) and then warm
+    (same directory again) in a child process, so peak RSS is measured per install. The warm
+    install is skipped when the cold one failed, since it would really be a second cold run.
+    Returns one result dict per install.
+    """
+    files = build_benchmark_fixture(num_objects, num_libraries, jar_size, seed)
+    server = BenchmarkServer(files, latency, bandwidth, failure_rate, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🧪 Serving {len(files)} files ({launcher.format_bytes(sum(map(len, files.values())))}) at {server.base_url}")
+    results = []
+    try:
+        for run in range(runs):
+            home = tempfile.mkdtemp(prefix="ctlauncher-bench-")
+            env = dict(os.environ, HOME=home, USERPROFILE=home)
+            env.pop("CTLAUNCHER_BLOBS_DIR", None)
+            try:
+                for mode in ("cold", "warm"):
+                    if mode == "warm" and not results[-1]["ok"]:
+                        print(f"⏭️ Run {run + 1} warm: skipped, the cold install failed")
+                        break
+                    requests_before, failures_before, bytes_before = server.requests, server.failures, server.bytes_sent
+                    started = time.monotonic()
+                    proc = subprocess.Popen([sys.executable, LAUNCHER_PATH, "install", BENCH_VERSION,
+                                             "--no-java", "--json", "--mirror", server.base_url],
+                                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+                    output = proc.stdout.read()
+                    peak_rss = None
+                    if hasattr(os, "wait4"):
+                        _, status, usage = os.wait4(proc.pid, 0)
+                        proc.returncode = os.waitstatus_to_exitcode(status)
+                        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+                        peak_rss = usage.ru_maxrss if platform.system() == "Darwin" else usage.ru_maxrss * 1024
+                    else:
+                        proc.wait()
+                    wall = time.monotonic() - started
+                    install = json.loads(output)["installs"][0] if output.strip() else {"ok": False}
+                    sent = server.bytes_sent - bytes_before
+                    result = {"run": run + 1, "mode": mode, "ok": install["ok"], "wall_time": round(wall, 3),
+                              "requests": server.requests - requests_before,
+                              "injected_failures": server.failures - failures_before,
+                              "bytes_served": sent, "throughput": round(sent / wall, 1) if wall else 0.0,
+                              "peak_rss": peak_rss}
+                    results.append(result)
+                    print(f"⏱️ Run {run + 1} {mode}: {'ok' if result['ok'] else 'FAILED'} in {wall:.2f}s, "
+                          f"{result['requests']} requests, {launcher.format_bytes(sent)} at {launcher.format_bytes(result['throughput'])}/s"
+                          + (f", peak RSS {launcher.format_bytes(peak_rss)}" if peak_rss else ""))
+            finally:
+                shutil.rmtree(home, ignore_errors=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main(argv=None):
+    """Command line entry point; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Time cold and warm installs of a synthetic version "
+                                                 "served from a local HTTP server")
+    parser.add_argument("--objects", type=int, default=3000, help="asset objects in the synthetic index")
+    parser.add_argument("--libraries", type=int, default=40)
+    parser.add_argument("--jar-size", type=int, default=4096, help="client JAR payload in KB")
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds added to every response")
+    parser.add_argument("--bandwidth", type=int, default=0, help="per-connection cap in KB/s (0 for unlimited)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests that fail, 0..1")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print one JSON result on stdout, logs go to stderr")
+    args = parser.parse_args(argv)
+    
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        results = run_download_benchmark(args.objects, args.libraries, args.jar_size * 1024, args.latency / 1000,
+                                         args.bandwidth * 1024, args.failure_rate, args.runs, args.seed)
+    ok = bool(results) and all(r["ok"] for r in results)
+    if args.json:
+        print(json.dumps({"benchmark": results, "ok": ok}))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
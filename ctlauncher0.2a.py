@@ -2,30 +2,1049 @@ import os
 import sys
 import subprocess
 import platform
-import urllib.request
 import zipfile
 import json
 import shutil
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+import tarfile
+import tempfile
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox
+except ImportError:  # headless machines: the command line interface works without Tk
+    tk = None
 import re
 import hashlib
-import ssl
 import time
-import requests  # Added for dynamic Java version fetching
+import threading
+import queue
+import collections
+import itertools
+import urllib.parse
+import functools
+import atexit
+import cProfile
+import pstats
+import requests  # HTTP client with keep-alive connection pooling
+from requests.adapters import HTTPAdapter
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 
 # Define constants for directories and URLs
 CTLAUNCHER_DIR = os.path.expanduser("~/.ctlauncher")
 VERSIONS_DIR = os.path.join(CTLAUNCHER_DIR, "versions")
 JAVA_DIR = os.path.expanduser("~/.ctlauncher/java")
-VERSION_MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest.json"
+VERSION_MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"  # v2 lists each JSON's sha1
+# Optional mirror serving upstream files as <mirror>/<host>/<path>, e.g. an unpacked offline bundle
+MIRROR_BASE_URL = os.environ.get("CTLAUNCHER_MIRROR", "")
+BUNDLE_INDEX_NAME = "bundle.json"  # index stored inside offline bundles
+BUNDLE_FORMAT = 1
 ASSETS_DIR = os.path.join(CTLAUNCHER_DIR, "assets")
+VERIFY_INDEX_PATH = os.path.join(CTLAUNCHER_DIR, "verified_files.json")
+CACHE_DIR = os.path.join(CTLAUNCHER_DIR, "cache")
+INSTANCES_DIR = os.path.join(CTLAUNCHER_DIR, "instances")  # one game directory per named instance
+# Content-addressed store of every SHA1-verified file; installs are hardlinked from it.
+# Point several launcher directories at the same store to share it; a store on another filesystem is disabled.
+BLOBS_DIR = os.environ.get("CTLAUNCHER_BLOBS_DIR") or os.path.join(CTLAUNCHER_DIR, "blobs")
+DEFAULT_INSTANCE = "Default"  # the instance that plays directly in CTLAUNCHER_DIR
+MANIFEST_CACHE_PATH = os.path.join(CACHE_DIR, "version_manifest.json")
+MANIFEST_META_PATH = os.path.join(CACHE_DIR, "version_manifest.meta.json")
+JAVA_REGISTRY_PATH = os.path.join(CACHE_DIR, "java_runtimes.json")
+NATIVES_RECORD_NAME = ".extracted.json"  # per-version record of files extracted from each native JAR
+LAUNCH_PLAN_FORMAT = 3  # bump when the compiled launch plan layout changes
+INSTALL_RECORD_NAME = "last_known_good.json"  # per-version file set of the last complete install
+FULL_VERIFY_INTERVAL = 7 * 24 * 3600  # seconds between full rehashes of a fast-launched version
+LAUNCH_METRICS_PATH = os.path.join(CTLAUNCHER_DIR, "logs", "launch_metrics.jsonl")
+MERGED_VERSION_SUFFIX = ".merged.json"  # cached result of merging a version with its inheritsFrom parents
+MAX_INHERITANCE_DEPTH = 10  # guards against inheritsFrom cycles
 
 # Download settings
 MAX_RETRIES = 5
 RETRY_DELAY = 2  # seconds
 DOWNLOAD_TIMEOUT = 60  # seconds
-RATE_LIMIT_DELAY = 0.1  # seconds between downloads
+DEFAULT_JAVA_MAJOR = 8  # for version JSONs without a javaVersion field
+JAVA_STREAMING_INSTALL = True  # extract the JDK while it downloads instead of saving the archive first
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes read per streamed chunk
+MAX_DOWNLOAD_WORKERS = 8  # worker threads shared by all download jobs of an install
+VERIFY_CHUNK_SIZE = 1024 * 1024  # bytes hashed per read when checking files already on disk
+MAX_VERIFY_WORKERS = min(8, os.cpu_count() or 1)  # hashing threads for bulk verification
+
+# Download job priorities (lower runs first): critical-path files go ahead of small assets
+PRIORITY_CRITICAL = 0  # client JAR, asset index
+PRIORITY_LIBRARY = 1  # libraries and natives
+PRIORITY_ASSET = 2  # asset objects
+
+# HTTP connection pool settings (shared keep-alive session)
+USER_AGENT = "CTLauncher/1.0"
+HTTP_POOL_CONNECTIONS = 10  # number of per-host pools kept alive
+HTTP_POOL_MAXSIZE = 16  # keep-alive connections per host, keep >= MAX_DOWNLOAD_WORKERS
+HTTP_CONNECT_TIMEOUT = 10  # seconds
+HTTP_API_TIMEOUT = 10  # seconds, read timeout for small metadata requests
+HTTP_VERIFY_TLS = True  # requests ships its own CA bundle, so verification works everywhere
+
+# Background prefetch settings: keep upcoming versions downloaded before PLAY NOW is pressed
+PREFETCH_CATEGORIES = ["Latest Release"]  # version_categories kept warm
+PREFETCH_INTERVAL = 3600  # seconds between manifest checks
+PREFETCH_MAX_WORKERS = 2  # download threads used by the prefetcher
+PREFETCH_BANDWIDTH_LIMIT = 2 * 1024 * 1024  # bytes per second, 0 for unlimited
+PREFETCH_RECORD_PATH = os.path.join(CACHE_DIR, "prefetched.json")
+
+# Tracing: CTLAUNCHER_TRACE=jsonl|chrome writes timing spans to logs/, CTLAUNCHER_PROFILE=1 adds a cProfile dump
+TRACE_FORMAT = os.environ.get("CTLAUNCHER_TRACE", "")
+TRACE_PROFILE = os.environ.get("CTLAUNCHER_PROFILE", "") == "1"
+TRACE_DIR = os.path.join(CTLAUNCHER_DIR, "logs")
+
+UI_POLL_INTERVAL_MS = 50  # how often the Tk thread runs callbacks posted by worker threads
+
+# Progress reporting settings
+PROGRESS_EMIT_INTERVAL = 0.2  # seconds between throttled "progress" events
+PROGRESS_RATE_WINDOW = 5.0  # seconds of samples used for the throughput estimate
+PROGRESS_LOG_PATH = os.path.join(CTLAUNCHER_DIR, "logs", "download_progress.jsonl")
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\{([A-Za-z0-9_.]+)\}")  # ${name} tokens in version JSON arguments
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation: its name plus attributes and counters (bytes, cache hits, retries)."""
+
+    def __init__(self, name, attrs, parent=None):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def set(self, key, value):
+        """Attach an attribute to the span."""
+        self.attrs[key] = value
+
+    def add(self, key, amount=1):
+        """Increase a counter; safe to call from worker threads sharing the span."""
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+
+class NullSpan(Span):
+    """Span handed out while tracing is off; records nothing."""
+
+    def __init__(self):
+        super().__init__("null", {})
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+
+class Tracer:
+    """Records nested timing spans per thread and writes them under TRACE_DIR.
+
+    "jsonl" appends one JSON object per finished span as it happens; "chrome" collects
+    complete events and writes a chrome://tracing / Perfetto file at exit. With profiling on,
+    each thread's outermost span also runs under cProfile and the merged stats are dumped
+    next to the trace. Counters added with count() go to the current span and all of its
+    parents, which include the span a worker thread adopt()ed from the code that queued its work.
+    """
+
+    def __init__(self, fmt="", profile=False, directory=TRACE_DIR):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.null = NullSpan()
+        self.directory = directory
+        self.events = []
+        self.thread_names = {}
+        self.profiles = []
+        self.out_file = None
+        self.epoch = time.perf_counter()
+        self.stamp = None
+        self.configure(fmt, profile)
+        atexit.register(self.close)
+
+    def configure(self, fmt="", profile=False):
+        """Choose the output format ("", "jsonl" or "chrome") and whether to capture a cProfile."""
+        if fmt not in ("", "jsonl", "chrome"):
+            print(f"⚠️ Unknown trace format {fmt!r}, tracing stays off")
+            fmt = ""
+        self.format = fmt
+        self.profile = profile
+        self.enabled = bool(fmt) or profile
+
+    def output_path(self, extension):
+        """Return logs/trace-<time>-<pid>.<extension>; files written by one close() share the stamp."""
+        if self.stamp is None:
+            now = time.time()
+            self.stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}-{os.getpid()}"
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{'profile' if extension == 'prof' else 'trace'}-{self.stamp}.{extension}")
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def current(self):
+        """Return the innermost open span on this thread (a no-op span if there is none)."""
+        stack = self.stack() if self.enabled else None
+        return stack[-1] if stack else self.null
+
+    def adopt(self, span):
+        """Make span the parent of spans and counters on this (worker) thread."""
+        if self.enabled and span is not self.null:
+            self.local.stack = [span]
+
+    def count(self, key, amount=1):
+        """Add to a counter on the current span and every span enclosing it."""
+        if self.enabled:
+            span = self.current()
+            while span is not None:
+                span.add(key, amount)
+                span = span.parent
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed block as a span named name."""
+        if not self.enabled:
+            yield self.null
+            return
+        stack = self.stack()
+        profiler = None
+        if self.profile and not getattr(self.local, "profiling", False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self.local.profiling = True
+            except ValueError:  # another profiler is already active
+                profiler = None
+        span = Span(name, attrs, stack[-1] if stack else None)
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.set("error", type(e).__name__)
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            if profiler:
+                profiler.disable()
+                self.local.profiling = False
+                with self.lock:
+                    self.profiles.append(profiler)
+            self.record(span, start, end)
+
+    def record(self, span, start, end, thread=None):
+        """Write or collect a finished span (shown on thread, by default the current one)."""
+        thread = thread or threading.current_thread()
+        event = {"name": span.name, "ts": round((start - self.epoch) * 1e6), "dur": round((end - start) * 1e6),
+                 "tid": thread.ident, "thread": thread.name, "args": dict(span.attrs, **span.counters)}
+        if not self.format:
+            return
+        with self.lock:
+            if self.format == "chrome":
+                self.thread_names[thread.ident] = thread.name
+                self.events.append(dict(event, ph="X", pid=os.getpid()))
+                return
+            try:
+                if self.out_file is None:
+                    self.out_file = open(self.output_path("jsonl"), "a")
+                self.out_file.write(json.dumps(event) + "\n")
+                self.out_file.flush()
+            except Exception as e:
+                print(f"⚠️ Failed to write trace: {e}")
+                self.format = ""
+
+    def phase_spans(self):
+        """Return a DownloadProgress listener that records each download phase as a span.
+
+        Phases (jar, libraries, natives, assets) run interleaved on the worker pool, so they
+        cannot be with-blocks; they become children of the current span, on the current thread.
+        """
+        parent, thread, opened = self.current(), threading.current_thread(), {}
+        
+        def listener(event):
+            if not self.enabled:
+                return
+            if event["type"] == "phase_start":
+                span = Span(f"phase {event['phase']}", {}, None if parent is self.null else parent)
+                opened[event["phase"]] = (span, time.perf_counter())
+            elif event["type"] == "phase_end" and event["phase"] in opened:
+                span, start = opened.pop(event["phase"])
+                span.set("bytes_total", event["bytes_total"])
+                self.record(span, start, time.perf_counter(), thread)
+        return listener
+
+    def close(self):
+        """Flush the trace file and the cProfile dump, if any."""
+        with self.lock:
+            try:
+                if self.out_file:
+                    self.out_file.close()
+                    self.out_file = None
+                    print(f"🧭 Trace written to {self.output_path('jsonl')}")
+                if self.events:
+                    metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                                for tid, name in self.thread_names.items()]
+                    path = self.output_path("json")
+                    with open(path, "w") as f:
+                        json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f)
+                    self.events = []
+                    print(f"🧭 Trace written to {path}")
+                if self.profiles:
+                    path = self.output_path("prof")
+                    pstats.Stats(*self.profiles).dump_stats(path)
+                    self.profiles = []
+                    print(f"🧭 Profile written to {path} (open with python -m pstats)")
+                self.stamp = None
+            except Exception as e:
+                print(f"⚠️ Failed to write trace: {e}")
+
+
+TRACER = Tracer(TRACE_FORMAT, TRACE_PROFILE)
+
+
+def traced(name):
+    """Decorator running the function inside a TRACER span; costs one flag check while tracing is off."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_http_session():
+    """Return the shared HTTP session that pools keep-alive connections per host."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            session.verify = HTTP_VERIFY_TLS
+            _http_session = session
+        return _http_session
+
+
+
+def mirror_url(url):
+    """Return url rewritten to MIRROR_BASE_URL (as <mirror>/<host>/<path>) when a mirror is configured."""
+    if not MIRROR_BASE_URL:
+        return url
+    parts = urllib.parse.urlsplit(url)
+    mirrored = f"{MIRROR_BASE_URL.rstrip('/')}/{parts.netloc}{parts.path}"
+    return f"{mirrored}?{parts.query}" if parts.query else mirrored
+
+
+def mirror_path(url):
+    """Return the <host>/<path> location of an upstream URL inside a mirror or bundle."""
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def substitute_placeholders(args, values):
+    """Replace ${name} tokens in each argument in a single regex pass.
+
+    Unknown names are left untouched and reported once per call.
+    """
+    unknown = set()
+    
+    def lookup(match):
+        name = match.group(1)
+        if name in values:
+            return values[name]
+        unknown.add(name)
+        return match.group(0)
+    
+    result = [PLACEHOLDER_PATTERN.sub(lookup, arg) if "${" in arg else arg for arg in args]
+    if unknown:
+        print(f"⚠️ Unknown launch placeholders left as-is: {', '.join(sorted(unknown))}")
+    return result
+
+
+def benchmark_placeholders(num_args=2000, rounds=50):
+    """Time substitute_placeholders against the old per-key str.replace loop on a large modded argument list.
+
+    Raises ValueError if the two implementations disagree on any argument.
+    """
+    values = {f"key{i}": f"value{i}" for i in range(15)}
+    args = []
+    for i in range(num_args):
+        args.append(f"--opt{i}" if i % 2 else f"-Dmod{i}=${{key{i % 15}}}/${{key{(i + 3) % 15}}}")
+    
+    def replace_loop():
+        replacements = {f"${{{k}}}": v for k, v in values.items()}
+        out = []
+        for arg in args:
+            for key, value in replacements.items():
+                arg = arg.replace(key, value)
+            out.append(arg)
+        return out
+    
+    expected_args, actual_args = replace_loop(), substitute_placeholders(args, values)
+    if len(expected_args) != len(actual_args):
+        raise ValueError(f"placeholder substitution returned {len(actual_args)} arguments, expected {len(expected_args)}")
+    for i, (expected, actual) in enumerate(zip(expected_args, actual_args)):
+        if expected != actual:
+            raise ValueError(f"placeholder substitution differs at argument {i} ({args[i]!r}): "
+                             f"replace loop gave {expected!r}, single pass gave {actual!r}")
+    timings = {}
+    for name, func in (("replace loop", replace_loop), ("single pass", lambda: substitute_placeholders(args, values))):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        timings[name] = (time.perf_counter() - start) / rounds
+        print(f"⏱️ {name}: {timings[name] * 1000:.3f} ms for {num_args} args")
+    print(f"🚀 Speedup: {timings['replace loop'] / timings['single pass']:.1f}x")
+    return timings
+
+
+def format_bytes(num_bytes):
+    """Format a byte count for display, e.g. 12.3 MB."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def game_platform():
+    """Return this machine's OS as named in version JSON rules ("windows", "linux", "osx") and its "${arch}" bits."""
+    current_os = platform.system().lower()
+    if current_os == "darwin":
+        current_os = "osx"
+    return current_os, "64" if sys.maxsize > 2 ** 32 else "32"
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to path via a uniquely named temp file, so concurrent writers never share one."""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DownloadProgress:
+    """Thread-safe byte counters, throughput, ETA and per-phase timing for one download run.
+
+    Every change is published as a plain dict event to the registered listeners, so the same
+    stream drives the Tk progress bar and can be written out as JSON lines.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        """Clear all counters before a new run."""
+        with self.lock:
+            self.bytes_done = 0  # downloaded plus already-present bytes
+            self.bytes_downloaded = 0  # bytes that actually came over the network
+            self.bytes_total = 0
+            self.phases = {}  # active phase name -> start time; phases may overlap
+            self.phase_times = {}  # phase name -> seconds
+            self.started = time.monotonic()
+            self.samples = collections.deque([(self.started, 0)])  # (time, bytes_downloaded)
+            self.last_emit = 0.0
+
+    def add_listener(self, listener):
+        """Register listener(event) to receive every progress event."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop sending events to listener."""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def start_phase(self, name, bytes_total=0):
+        """Begin a named phase (assets, jar, libraries, natives, java) adding its expected bytes."""
+        with self.lock:
+            started = name not in self.phases
+            if started:
+                self.phases[name] = time.monotonic()
+            self.bytes_total += bytes_total
+        if started:
+            self.emit("phase_start", phase=name)
+
+    def end_phase(self, name=None):
+        """Close one phase (or every active phase) and record how long it took."""
+        now = time.monotonic()
+        with self.lock:
+            names = [name] if name is not None else list(self.phases)
+            ended = [(n, now - self.phases.pop(n)) for n in names if n in self.phases]
+            for n, duration in ended:
+                self.phase_times[n] = self.phase_times.get(n, 0.0) + duration
+        for n, duration in ended:
+            self.emit("phase_end", phase=n, duration=round(duration, 3))
+
+    def advance(self, num_bytes, downloaded=True):
+        """Count bytes as done; downloaded=False for files that were already present.
+
+        Bytes fetched outside a phase (metadata such as the version JSON) only count towards
+        throughput, since they are not part of any announced total.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if self.phases:
+                self.bytes_done += num_bytes
+            if downloaded:
+                self.bytes_downloaded += num_bytes
+                self.samples.append((now, self.bytes_downloaded))
+                while len(self.samples) > 2 and now - self.samples[0][0] > PROGRESS_RATE_WINDOW:
+                    self.samples.popleft()
+            if now - self.last_emit < PROGRESS_EMIT_INTERVAL:
+                return
+            self.last_emit = now
+        self.emit("progress")
+
+    def finish(self):
+        """End the run and publish the final totals and phase timings."""
+        self.end_phase()
+        self.emit("finished")
+
+    def snapshot(self):
+        """Return the current counters, throughput (bytes/s) and ETA (seconds) as a dict."""
+        with self.lock:
+            now = time.monotonic()
+            (t0, b0), b1 = self.samples[0], self.samples[-1][1]
+            throughput = (b1 - b0) / (now - t0) if now > t0 else 0.0
+            remaining = max(self.bytes_total - self.bytes_done, 0)
+            return {
+                "phases": list(self.phases),
+                "bytes_done": self.bytes_done,
+                "bytes_downloaded": self.bytes_downloaded,
+                "bytes_total": self.bytes_total,
+                "throughput": round(throughput, 1),
+                "eta": round(remaining / throughput, 1) if throughput > 0 else None,
+                "elapsed": round(now - self.started, 3),
+                "phase_times": {k: round(v, 3) for k, v in self.phase_times.items()}
+            }
+
+    def emit(self, event_type, **fields):
+        """Send an event dict to every listener."""
+        event = {"type": event_type, "time": time.time()}
+        event.update(self.snapshot())
+        event.update(fields)
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"⚠️ Progress listener failed: {e}")
+
+
+class ProgressEventLog:
+    """Progress listener that writes each event as one JSON line to a file or stream."""
+
+    def __init__(self, target):
+        self.owns_stream = isinstance(target, str)
+        if self.owns_stream:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            self.stream = open(target, "w")
+        else:
+            self.stream = target
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        with self.lock:
+            self.stream.write(json.dumps(event) + "\n")
+            self.stream.flush()
+
+    def close(self):
+        """Close the underlying file if this listener opened it."""
+        if self.owns_stream:
+            self.stream.close()
+
+
+class JavaRuntimeRegistry:
+    """Finds Java binaries on PATH, in JAVA_HOME and under JAVA_DIR, remembering their major versions.
+
+    The major version of each binary is cached on disk keyed by resolved path and mtime, so
+    `java -version` only runs for binaries that are new or have changed since the last probe.
+    """
+
+    def __init__(self, path=JAVA_REGISTRY_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.runtimes = None  # memoized [(java_bin, major)] for this session
+        try:
+            with open(self.path, "r") as f:
+                self.versions = json.load(f)  # real path -> [mtime_ns, major or None]
+        except Exception:
+            self.versions = {}
+
+    @staticmethod
+    def candidates():
+        """Return existing java binaries from PATH, JAVA_HOME and JAVA_DIR, in that order of preference."""
+        exe = "java.exe" if platform.system() == "Windows" else "java"
+        paths = []
+        on_path = shutil.which("java")
+        if on_path:
+            paths.append(on_path)
+        if os.environ.get("JAVA_HOME"):
+            paths.append(os.path.join(os.environ["JAVA_HOME"], "bin", exe))
+        if os.path.isdir(JAVA_DIR):
+            for dir_name in sorted(os.listdir(JAVA_DIR)):
+                for bin_dir in (("bin",), ("Contents", "Home", "bin")):  # macOS archives nest a bundle
+                    paths.append(os.path.join(JAVA_DIR, dir_name, *bin_dir, exe))
+        return [path for path in paths if os.path.isfile(path)]
+
+    @staticmethod
+    def probe_major(java_bin):
+        """Run `java -version` and return the major version, or None if it cannot be read."""
+        try:
+            result = subprocess.run([java_bin, "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, timeout=30)
+            match = re.search(r'version "(\d+)(?:\.(\d+))?', result.stderr)
+            if match:
+                major = int(match.group(1))
+                if major == 1 and match.group(2):  # Java 8 and older report "1.8.0_..."
+                    major = int(match.group(2))
+                return major
+        except Exception as e:
+            print(f"⚠️ Could not run {java_bin}: {e}")
+        return None
+
+    def major_version(self, java_bin):
+        """Return the cached major version of java_bin, probing only if it is new or changed."""
+        real_path = os.path.realpath(java_bin)
+        try:
+            mtime = os.stat(real_path).st_mtime_ns
+        except OSError:
+            return None
+        with self.lock:
+            cached = self.versions.get(real_path)
+        if cached and cached[0] == mtime:
+            TRACER.count("java_probe_cache_hits")
+            return cached[1]
+        TRACER.count("java_probe_runs")
+        major = self.probe_major(real_path)
+        with self.lock:
+            self.versions[real_path] = [mtime, major]
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "w") as f:
+                    json.dump(self.versions, f)
+            except Exception as e:
+                print(f"⚠️ Failed to save Java runtime cache: {e}")
+        return major
+
+    def list_runtimes(self, refresh=False):
+        """Return [(java_bin, major)] for every distinct runtime found, memoized until refresh()."""
+        if self.runtimes is None or refresh:
+            runtimes, seen = [], set()
+            for java_bin in self.candidates():
+                real_path = os.path.realpath(java_bin)
+                if real_path in seen:
+                    continue
+                seen.add(real_path)
+                major = self.major_version(java_bin)
+                if major is not None:
+                    runtimes.append((java_bin, major))
+            self.runtimes = runtimes
+        return self.runtimes
+
+    def refresh(self):
+        """Forget the memoized runtime list, e.g. after installing a new runtime."""
+        self.runtimes = None
+
+    @traced("find_java")
+    def find(self, min_major, exact=False):
+        """Return the first java binary whose major version is at least min_major (or equal, if exact)."""
+        for java_bin, major in self.list_runtimes():
+            if major == min_major or (major > min_major and not exact):
+                return java_bin
+        return None
+
+
+class HashingReader:
+    """Read-only file wrapper that hashes every byte read from the underlying stream."""
+
+    def __init__(self, stream, hasher, on_read=None):
+        self.stream = stream
+        self.hasher = hasher
+        self.on_read = on_read  # called with each chunk length, e.g. for progress and cancellation
+
+    def read(self, size=-1):
+        data = self.stream.read(None if size is None or size < 0 else size)
+        if data:
+            self.hasher.update(data)
+            if self.on_read:
+                self.on_read(len(data))
+        return data
+
+    def drain(self):
+        """Read to EOF so the hash covers bytes the extractor did not need (e.g. tar padding)."""
+        while self.read(DOWNLOAD_CHUNK_SIZE):
+            pass
+
+
+class DownloadScheduler:
+    """Shared worker pool that runs download jobs in priority order.
+
+    Jobs are dicts with url, path, sha1, size and description keys plus optional priority,
+    phase and on_done(job, ok) keys. on_done runs on the worker as soon as its job finishes
+    (serialized by a lock) and may submit follow-up jobs; that is how dependent work such as
+    asset objects after their index, or native extraction after a download, is chained into
+    the same graph. ok is None when the file was already in place.
+    """
+
+    def __init__(self, launcher, max_workers=None):
+        self.launcher = launcher
+        self.max_workers = max(1, max_workers or MAX_DOWNLOAD_WORKERS)
+        self.queue = queue.PriorityQueue()
+        self.order = itertools.count()  # FIFO tie-break within a priority
+        self.condition = threading.Condition()
+        self.callback_lock = threading.Lock()
+        self.pending = 0
+        self.phase_pending = {}  # phase name -> unfinished jobs
+        self.failed = []
+        self.error = None
+        self.trace_parent = TRACER.current()  # worker spans and counters roll up into the caller's span
+
+    def submit(self, job):
+        """Queue a job; its size counts towards its progress phase right away."""
+        phase = job.get("phase")
+        with self.condition:
+            self.pending += 1
+            if phase:
+                self.phase_pending[phase] = self.phase_pending.get(phase, 0) + 1
+        if phase:
+            self.launcher.progress.start_phase(phase, job.get("size", 0))
+        self.queue.put((job.get("priority", PRIORITY_ASSET), next(self.order), job))
+
+    def run(self):
+        """Run until every job and follow-up is done; return the failed jobs or raise the first error."""
+        workers = [threading.Thread(target=self.worker, daemon=True) for _ in range(self.max_workers)]
+        for worker in workers:
+            worker.start()
+        with self.condition:
+            while self.pending:
+                self.condition.wait()
+        for _ in workers:
+            self.queue.put((float("inf"), next(self.order), None))
+        for worker in workers:
+            worker.join()
+        if self.error is not None:
+            raise self.error
+        return self.failed
+
+    def worker(self):
+        """Worker thread loop: fetch jobs until a stop marker arrives."""
+        TRACER.adopt(self.trace_parent)
+        while True:
+            _, _, job = self.queue.get()
+            if job is None:
+                return
+            try:
+                if self.error is None:  # after a cancel or error, drain the queue without working
+                    ok = self.launcher.fetch_file(job)
+                    with self.callback_lock:
+                        if ok is False:
+                            self.failed.append(job)
+                        if job.get("on_done"):
+                            job["on_done"](job, ok)
+            except BaseException as e:
+                with self.condition:
+                    if self.error is None:
+                        self.error = e
+            finally:
+                self.job_finished(job)
+
+    def job_finished(self, job):
+        """Update counters, closing the job's progress phase when its last job is done."""
+        phase = job.get("phase")
+        with self.condition:
+            self.pending -= 1
+            phase_done = False
+            if phase:
+                self.phase_pending[phase] -= 1
+                phase_done = self.phase_pending[phase] == 0
+            self.condition.notify_all()
+        if phase_done:
+            self.launcher.progress.end_phase(phase)
+
+
+class BandwidthLimiter:
+    """Token bucket shared by download threads to cap their combined bytes per second."""
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.tokens = float(bytes_per_second)  # allow up to one second of burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, num_bytes):
+        """Take num_bytes from the bucket and return how long the caller should sleep."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.rate), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= num_bytes
+            return max(0.0, -self.tokens / self.rate)
+
+
+class PrefetchDaemon:
+    """Download chosen version categories ahead of time on a background thread.
+
+    Uses its own LauncherCore that shares the launcher's caches, a BandwidthLimiter and a
+    small worker pool, and remembers which manifest URL each version was prefetched from so
+    unchanged versions are skipped on the next pass.
+    """
+
+    def __init__(self, launcher, categories=None, interval=PREFETCH_INTERVAL,
+                 bytes_per_second=PREFETCH_BANDWIDTH_LIMIT, max_workers=PREFETCH_MAX_WORKERS):
+        self.worker = LauncherCore(shared=launcher)
+        self.worker.cancel_event = threading.Event()  # stop() must not cancel the launcher's own task
+        self.worker.rate_limiter = BandwidthLimiter(bytes_per_second) if bytes_per_second else None
+        self.worker.max_download_workers = max_workers
+        self.categories = categories or PREFETCH_CATEGORIES
+        self.interval = interval
+        self.thread = None
+
+    def start(self):
+        """Start prefetching in the background."""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop after the current file; running downloads are cancelled."""
+        self.worker.cancel_event.set()
+
+    def run(self):
+        """Prefetch, then wait for the next manifest check, until stopped."""
+        while not self.worker.cancel_event.is_set():
+            try:
+                self.run_once()
+            except TaskCancelled:
+                break
+            except Exception as e:
+                print(f"⚠️ Prefetch failed: {e}")
+            self.worker.cancel_event.wait(self.interval)
+        print("🛑 Prefetching stopped.")
+
+    def run_once(self):
+        """Refresh the manifest and download every wanted version not yet prefetched; returns the results."""
+        self.worker.load_version_manifest(background=False)
+        try:
+            with open(PREFETCH_RECORD_PATH, "r") as f:
+                record = json.load(f)  # version -> manifest URL it was prefetched from
+        except Exception:
+            record = {}
+        results = []
+        for category in self.categories:
+            for version in self.worker.version_categories.get(category, []):
+                version_url = self.worker.versions.get(version)
+                if not version_url or record.get(version) == version_url:
+                    continue
+                print(f"🔮 Prefetching {version} ({category})...")
+                self.worker.progress.reset()
+                ok = self.worker.download_version_files(version, version_url)
+                results.append({"version": version, "ok": ok,
+                                "bytes_downloaded": self.worker.progress.bytes_downloaded})
+                if ok:
+                    record[version] = version_url
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    with open(PREFETCH_RECORD_PATH, "w") as f:
+                        json.dump(record, f)
+        return results
+
+
+class TaskCancelled(Exception):
+    """Raised inside a background task when the user cancels it."""
+
+
+class VerifiedFileIndex:
+    """Persistent record of files whose SHA1 was already confirmed, keyed by path, size and mtime."""
+
+    def __init__(self, path=VERIFY_INDEX_PATH):
+        self.path = path
+        self.entries = {}  # absolute path -> [size, mtime_ns, sha1]
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # serializes writers so an older snapshot never lands last
+        self.load()
+
+    def load(self):
+        """Read the index from disk, starting empty if it is missing or unreadable."""
+        try:
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable verification index: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write the index back to disk if it changed."""
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                entries = dict(self.entries)
+                self.dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                write_json_atomic(self.path, entries)
+            except Exception as e:
+                print(f"⚠️ Failed to save verification index: {e}")
+                with self.lock:
+                    self.dirty = True  # try again on the next save
+
+    def lookup(self, file_path, expected_sha1):
+        """Return True if the file is unchanged since it was last verified against expected_sha1."""
+        entry = self.entries.get(os.path.abspath(file_path))
+        if not entry or entry[2] != expected_sha1:
+            return False
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        return entry[0] == st.st_size and entry[1] == st.st_mtime_ns
+
+    def record(self, file_path, sha1):
+        """Remember that the file currently on disk hashes to sha1."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+        with self.lock:
+            self.entries[os.path.abspath(file_path)] = [st.st_size, st.st_mtime_ns, sha1]
+            self.dirty = True
+
+    def forget(self, file_path):
+        """Drop any record for the file."""
+        with self.lock:
+            if self.entries.pop(os.path.abspath(file_path), None) is not None:
+                self.dirty = True
+
+
+class BlobStore:
+    """Content-addressed store of files keyed by SHA1, shared by every version and instance via hardlinks.
+
+    A blob whose link count drops to one is only referenced by the store and is removed by
+    collect_garbage. Blobs are never copied, since a copy would look unreferenced: if the store
+    is on another filesystem than the game files (or the filesystem has no hardlinks), it
+    disables itself with a single warning and files are simply downloaded in place.
+    """
+
+    def __init__(self, root=BLOBS_DIR):
+        self.root = root
+        self.usable = None  # decided on first use by available()
+        self.lock = threading.Lock()
+
+    def available(self, path):
+        """Return whether blobs can be hardlinked to files like path; checked once per store."""
+        if self.usable is None:
+            with self.lock:
+                if self.usable is None:
+                    try:
+                        os.makedirs(self.root, exist_ok=True)
+                        probe = os.path.dirname(os.path.abspath(path))
+                        while not os.path.exists(probe):
+                            probe = os.path.dirname(probe)
+                        self.usable = os.stat(self.root).st_dev == os.stat(probe).st_dev
+                    except OSError:
+                        self.usable = False
+                    if not self.usable:
+                        self.warn_disabled("it is not on the same filesystem as the game files")
+        return self.usable
+
+    def warn_disabled(self, reason):
+        """Turn the store off for this run; callers hold self.lock."""
+        self.usable = False
+        print(f"⚠️ Blob store {self.root} is disabled, {reason}")
+
+    def blob_path(self, sha1):
+        """Return where the blob for sha1 lives."""
+        return os.path.join(self.root, sha1[:2], sha1)
+
+    @staticmethod
+    def place(src, dest):
+        """Atomically put a hardlink of src at dest."""
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp_path = f"{dest}.{threading.get_ident()}.link"
+        os.link(src, tmp_path)
+        os.replace(tmp_path, dest)
+
+    def link_out(self, sha1, dest):
+        """Populate dest from the store; returns False if the blob is not stored."""
+        blob = self.blob_path(sha1)
+        if not self.available(dest) or not os.path.exists(blob):
+            return False
+        try:
+            self.place(blob, dest)
+            TRACER.count("blob_links")
+            return True
+        except OSError as e:
+            print(f"⚠️ Could not link {os.path.basename(dest)} from the blob store: {e}")
+            return False
+
+    def adopt(self, path, sha1):
+        """Store a verified file, or swap it for a link to the existing blob with the same content."""
+        if not self.available(path):
+            return
+        blob = self.blob_path(sha1)
+        try:
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                try:
+                    os.link(path, blob)
+                    return
+                except FileExistsError:
+                    pass  # Another worker stored the same content first
+                except OSError as e:
+                    with self.lock:
+                        if self.usable:
+                            self.warn_disabled(f"files cannot be hardlinked into it: {e}")
+                    return
+            if not os.path.samefile(path, blob):
+                self.place(blob, path)
+        except OSError as e:
+            print(f"⚠️ Could not add {os.path.basename(path)} to the blob store: {e}")
+
+    def discard(self, sha1):
+        """Remove a blob, e.g. when a linked copy failed verification."""
+        try:
+            os.remove(self.blob_path(sha1))
+        except OSError:
+            pass
+
+    def collect_garbage(self):
+        """Delete blobs nothing links to any more; returns (files removed, bytes freed)."""
+        removed, freed = 0, 0
+        if not os.path.isdir(self.root):
+            return removed, freed
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                    if st.st_nlink > 1:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += st.st_size
+        return removed, freed
+
 
 # CTLauncher theme colors - Dark theme (original)
 DARK_THEME = {
@@ -59,82 +1078,1803 @@ LIGHT_THEME = {
     'tab_inactive': '#ffffff'
 }
 
-class CTLauncher(tk.Tk):
-    def __init__(self):
-        """Initialize the CTLauncher window and UI."""
-        super().__init__()
-        self.title("CTLauncher v1.0")
-        self.geometry("900x550")
-        self.minsize(800, 500)
-        self.themes = {'Dark': DARK_THEME, 'Light': LIGHT_THEME}
-        self.current_theme_mode = 'Dark'
-        self.theme = self.themes[self.current_theme_mode]
-        self.configure(bg=self.theme['bg'])
-        self.versions = {}  # Dictionary to store version IDs and their URLs
+class LauncherCore:
+    """Download, verification and launch logic shared by the Tk launcher and the command line."""
+
+    def __init__(self, shared=None):
+        """Set up download, verification and launch state; pass shared to reuse another launcher's caches."""
+        if shared is None:
+            self.verified_files = VerifiedFileIndex()
+            self.blobs = BlobStore()
+            self.java_runtimes = JavaRuntimeRegistry()
+            self.launch_plans = {}  # (version, os) -> compiled launch plan, see get_launch_plan
+            self.versions = {}  # Dictionary to store version IDs and their URLs
+            self.version_sha1s = {}  # version ID -> SHA1 of its JSON, from the manifest
+            self.version_json_cache = {}  # path -> (size, mtime_ns, parsed JSON) for this session
+            self.resolved_versions = {}  # version ID -> (merged data, sources) for this session
+            self.file_locks = collections.defaultdict(threading.Lock)  # path -> lock held while fetching it
+            self.java_install_lock = threading.Lock()
+            self.cancel_event = threading.Event()  # Set to stop the running launch task
+        else:
+            for name in ("verified_files", "blobs", "java_runtimes", "launch_plans", "versions", "version_sha1s",
+                         "version_json_cache", "resolved_versions", "file_locks", "java_install_lock",
+                         "cancel_event"):
+                setattr(self, name, getattr(shared, name))
+        self.deep_verify = False  # When True, rehash every file instead of trusting the index
+        self.game_dir = CTLAUNCHER_DIR  # game directory of the selected instance
+        self.rate_limiter = None  # BandwidthLimiter applied to every download, if any
+        self.background_verify = None  # thread verifying a fast-launched version, see download_and_launch
+        self.click_to_spawn = None  # seconds from PLAY NOW to JVM spawn of the last launch
+        self.max_download_workers = None  # defaults to MAX_DOWNLOAD_WORKERS
+        self.progress = DownloadProgress()
+        self.errors = []  # messages passed to show_error, reported by the command line
         self.version_categories = {
             "Latest Release": [],
             "Latest Snapshot": [],
             "Release": [],
             "Snapshot": [],
             "Old Beta": [],
-            "Old Alpha": []
+            "Old Alpha": [],
+            "Modded": []  # installed profiles that inherit from another version (Fabric, Forge, Quilt)
         }
-        
-        # Configure styles
-        self.style = ttk.Style()
-        self.style.theme_use('clam')
-        self.apply_theme_styles()
-        self.init_ui()
 
-    def apply_theme_styles(self):
-        """Apply theme to ttk styles."""
-        self.style.configure("TFrame", background=self.theme['bg'])
-        self.style.configure("TLabel", background=self.theme['bg'], foreground=self.theme['text'])
-        self.style.configure("TButton",
-                             background=self.theme['button'],
-                             foreground=self.theme['text'],
-                             borderwidth=0,
-                             focuscolor='none')
-        self.style.map("TButton",
-                       background=[('active', self.theme['button_hover']),
-                                   ('pressed', self.theme['accent'])])
-        
-        self.style.configure("TCombobox",
-                             fieldbackground=self.theme['input_bg'],
-                             background=self.theme['input_bg'],
-                             foreground=self.theme['text'],
-                             arrowcolor=self.theme['text'],
-                             borderwidth=0)
-        
-        self.style.configure("TScale",
-                             background=self.theme['bg'],
-                             troughcolor=self.theme['input_bg'])
-        
-        self.style.configure("TNotebook",
-                             background=self.theme['header_bg'],
-                             borderwidth=0)
-        self.style.configure("TNotebook.Tab",
-                             background=self.theme['tab_inactive'],
-                             foreground=self.theme['text_secondary'],
-                             padding=[15, 5],
-                             borderwidth=0)
-        self.style.map("TNotebook.Tab",
-                       background=[('selected', self.theme['tab_active'])],
-                       foreground=[('selected', self.theme['text'])])
+    def post_to_ui(self, callback, *args):
+        """Run callback(*args) right away; the Tk launcher marshals it onto its main thread instead."""
+        callback(*args)
 
-    def init_ui(self):
-        """Set up the graphical user interface with CTLauncher styling."""
-        # Header
-        self.header = tk.Frame(self, bg=self.theme['header_bg'], height=40)
-        self.header.pack(fill="x", side="top")
-        self.header.pack_propagate(False)
-        
-        # Header title
-        self.title_label = tk.Label(self.header, text="CTLauncher", font=("Arial", 14, "bold"),
-                         bg=self.theme['header_bg'], fg=self.theme['accent'])
-        self.title_label.pack(side="left", padx=15, pady=10)
-        
-        # Header version
+    def show_error(self, title, message):
+        """Report an error; the Tk launcher shows a dialog instead."""
+        self.errors.append(message)
+        print(f"❌ {title}: {message}")
+
+    def show_warning(self, title, message):
+        """Report a warning; the Tk launcher shows a dialog instead."""
+        print(f"⚠️ {title}: {message}")
+
+    def set_status(self, text):
+        """Report launch status; the Tk launcher shows it under the PLAY button."""
+        if text:
+            print(f"ℹ️ {text}")
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if the user cancelled the running task."""
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def sleep_unless_cancelled(self, seconds):
+        """Sleep for a retry delay, waking early (and raising) if the task is cancelled."""
+        self.cancel_event.wait(seconds)
+        self.check_cancelled()
+
+    @traced("download_with_retry")
+    def download_with_retry(self, url, output_path, description="file", expected_sha1=None):
+        """Download a file with retry logic and checksum verification.
+
+        The body is streamed in DOWNLOAD_CHUNK_SIZE pieces to a .part file while its SHA1 is
+        computed, and the file is only renamed into place once the checksum matches. A .part
+        file left by a failed attempt or an earlier run is resumed with an HTTP Range request.
+        Without an expected SHA1 a resume is only attempted when the server's ETag or
+        Last-Modified validator was saved next to the .part file, and is sent as If-Range.
+        """
+        part_path = output_path + ".part"
+        validator_path = part_path + ".validator"
+
+        def discard_part():
+            for path in (part_path, validator_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        TRACER.current().set("file", description)
+        sha1, hashed_bytes = hashlib.sha1(), 0
+        reported = 0  # bytes of this file already counted in self.progress
+        for attempt in range(MAX_RETRIES):
+            self.check_cancelled()
+            if attempt:
+                TRACER.count("retries")
+            try:
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                validator = None
+                if offset and os.path.exists(validator_path):
+                    with open(validator_path, "r") as f:
+                        validator = f.read().strip() or None
+                if offset and not expected_sha1 and not validator:
+                    discard_part()  # Nothing to prove the partial bytes are still current
+                    offset = 0
+                if offset != hashed_bytes:
+                    # Partial file from an earlier run or a torn write: hash what is on disk
+                    sha1, hashed_bytes = hashlib.sha1(), 0
+                    with open(part_path, "rb") as f:
+                        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                            sha1.update(chunk)
+                            hashed_bytes += len(chunk)
+
+                self.progress.advance(offset - reported, downloaded=False)
+                reported = offset
+
+                headers = {}
+                if offset:
+                    print(f"⏯️ Resuming {description} at byte {offset} (attempt {attempt + 1}/{MAX_RETRIES})...")
+                    headers["Range"] = f"bytes={offset}-"
+                    if validator:
+                        headers["If-Range"] = validator
+                else:
+                    print(f"📥 Downloading {description} (attempt {attempt + 1}/{MAX_RETRIES})...")
+                
+                with get_http_session().get(mirror_url(url), headers=headers, stream=True,
+                                            timeout=(HTTP_CONNECT_TIMEOUT, DOWNLOAD_TIMEOUT)) as response:
+                    # 416 means there is nothing past offset: the .part file may already be complete
+                    if not (offset and response.status_code == 416):
+                        response.raise_for_status()
+                        content_range = response.headers.get("Content-Range", "")
+                        if offset and (response.status_code != 206
+                                       or not content_range.startswith(f"bytes {offset}-")):
+                            # Server ignored the Range (or the file changed), start from byte zero
+                            offset = 0
+                            sha1, hashed_bytes = hashlib.sha1(), 0
+                            self.progress.advance(-reported, downloaded=False)
+                            reported = 0
+                        if not offset:
+                            discard_part()
+                            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                            if validator:
+                                with open(validator_path, "w") as f:
+                                    f.write(validator)
+                        with open(part_path, 'ab' if offset else 'wb') as out_file:
+                            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                                self.check_cancelled()
+                                out_file.write(chunk)
+                                sha1.update(chunk)
+                                hashed_bytes += len(chunk)
+                                self.progress.advance(len(chunk))
+                                reported += len(chunk)
+                                TRACER.count("bytes_downloaded", len(chunk))
+                                if self.rate_limiter:
+                                    delay = self.rate_limiter.reserve(len(chunk))
+                                    if delay:
+                                        self.sleep_unless_cancelled(delay)
+                
+                # Verify checksum if provided
+                if expected_sha1 and sha1.hexdigest() != expected_sha1:
+                    print(f"⚠️ Checksum mismatch for {description}, retrying...")
+                    discard_part()
+                    sha1, hashed_bytes = hashlib.sha1(), 0
+                    self.progress.advance(-reported, downloaded=False)
+                    reported = 0
+                    if attempt < MAX_RETRIES - 1:
+                        self.sleep_unless_cancelled(RETRY_DELAY * (attempt + 1))
+                        continue
+                    else:
+                        return False
+                
+                os.replace(part_path, output_path)
+                if os.path.exists(validator_path):
+                    os.remove(validator_path)
+                if expected_sha1:
+                    self.verified_files.record(output_path, expected_sha1)
+                print(f"✅ Downloaded {description} successfully!")
+                return True
+                
+            except (requests.RequestException, ConnectionError, TimeoutError) as e:
+                # Keep the .part file so the next attempt can resume where this one stopped
+                print(f"⚠️ Network error downloading {description}: {e}")
+                
+                if attempt < MAX_RETRIES - 1:
+                    wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
+                    print(f"🔄 Retrying in {wait_time} seconds...")
+                    self.sleep_unless_cancelled(wait_time)
+                else:
+                    print(f"❌ Failed to download {description} after {MAX_RETRIES} attempts")
+                    return False
+                    
+            except TaskCancelled:
+                raise
+            except Exception as e:
+                print(f"❌ Unexpected error downloading {description}: {e}")
+                return False
+        
+        return False
+
+    def fetch_file(self, job):
+        """Make sure a job's file is present and verified, downloading it if needed.
+
+        Returns None if the file was already in place, otherwise the download_with_retry result.
+        Concurrent installs sharing a file (libraries, assets) fetch it one at a time.
+        """
+        self.check_cancelled()
+        with self.file_locks[os.path.abspath(job["path"])]:
+            return self.fetch_file_locked(job)
+
+    def fetch_file_locked(self, job):
+        """fetch_file body, run while holding the job path's lock."""
+        path, sha1 = job["path"], job.get("sha1")
+        if os.path.exists(path) and (not sha1 or self.is_file_verified(path, sha1, job.get("size"))):
+            self.progress.advance(job.get("size", 0), downloaded=False)
+            TRACER.count("files_present")
+            return None
+        if sha1 and self.blobs.link_out(sha1, path):
+            if self.is_file_verified(path, sha1):
+                self.progress.advance(job.get("size", 0), downloaded=False)
+                return None
+            print(f"⚠️ Stored copy of {job['description']} is corrupt, downloading it again...")
+            self.blobs.discard(sha1)
+            os.remove(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ok = self.download_with_retry(job["url"], path, job["description"], sha1)
+        TRACER.count("files_downloaded" if ok else "files_failed")
+        if ok and sha1:
+            self.blobs.adopt(path, sha1)
+        return ok
+
+    def download_many(self, jobs, max_workers=None, on_done=None):
+        """Download a batch of files concurrently on a bounded worker pool.
+
+        Each job is a dict with url, path, description, sha1 and optional size keys. Files that
+        already exist with a matching checksum are skipped. on_done(job, ok) is called once per
+        job as it finishes, with ok=None for skipped files. Returns the failed jobs.
+        """
+        scheduler = DownloadScheduler(self, max_workers)
+        for job in jobs:
+            if on_done and "on_done" not in job:
+                job = dict(job, on_done=on_done)
+            scheduler.submit(job)
+        return scheduler.run()
+
+    @traced("load_version_manifest")
+    def load_version_manifest(self, background=True):
+        """Fill the version lists from the cached manifest, then revalidate it (in the background by default)."""
+        manifest = None
+        try:
+            if os.path.exists(MANIFEST_CACHE_PATH):
+                with open(MANIFEST_CACHE_PATH, "r") as f:
+                    manifest = json.load(f)
+                self.apply_version_manifest(manifest)
+                print("✅ Version manifest loaded from cache!")
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable cached version manifest: {e}")
+            manifest = None
+        if not background:
+            self.refresh_version_manifest(manifest is not None)
+            return
+        threading.Thread(target=self.refresh_version_manifest, args=(manifest is not None,),
+                         daemon=True).start()
+
+    @traced("refresh_version_manifest")
+    def refresh_version_manifest(self, have_cache=False):
+        """Revalidate the cached manifest with a conditional request (runs on a worker thread)."""
+        meta = {}
+        if have_cache and os.path.exists(MANIFEST_META_PATH):
+            try:
+                with open(MANIFEST_META_PATH, "r") as f:
+                    meta = json.load(f)
+            except Exception:
+                meta = {}
+        headers = {
+            'User-Agent': 'CTLauncher/1.0 (Minecraft Launcher)',
+            'Accept': 'application/json'
+        }
+        if meta.get("etag"):
+            headers['If-None-Match'] = meta["etag"]
+        if meta.get("last_modified"):
+            headers['If-Modified-Since'] = meta["last_modified"]
+        
+        try:
+            response = get_http_session().get(mirror_url(VERSION_MANIFEST_URL), headers=headers,
+                                              timeout=(HTTP_CONNECT_TIMEOUT, HTTP_API_TIMEOUT))
+            with response:
+                if response.status_code == 304:
+                    TRACER.count("manifest_not_modified")
+                    print("✅ Cached version manifest is up to date!")
+                    return
+                response.raise_for_status()
+                manifest = response.json()
+                TRACER.count("manifest_downloads")
+                meta = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified")
+                }
+            
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            for path, data in ((MANIFEST_CACHE_PATH, manifest), (MANIFEST_META_PATH, meta)):
+                write_json_atomic(path, data)
+            self.post_to_ui(self.apply_version_manifest, manifest)
+            print("✅ Version manifest loaded successfully!")
+            return
+        except requests.exceptions.SSLError as e:
+            print(f"❌ SSL error loading version manifest: {e}")
+            message = f"SSL verification failed.\n\nError: {str(e)}\n\nPlease check your internet connection."
+        except requests.RequestException as e:
+            print(f"❌ Network error loading version manifest: {e}")
+            message = f"Failed to load version manifest.\n\nNetwork Error: {str(e)}\n\nPlease check your internet connection and firewall settings."
+        except Exception as e:
+            print(f"❌ Error loading version manifest: {e}")
+            message = f"Failed to load version manifest.\n\nError: {str(e)}\n\nPlease check your internet connection."
+        
+        if have_cache:
+            print("📴 Offline: using the cached version manifest.")
+        else:
+            self.show_error("CTLauncher Error", message)
+
+    def apply_version_manifest(self, manifest):
+        """Sort the manifest's versions into categories."""
+        # Clear existing categories
+        for category in self.version_categories:
+            self.version_categories[category] = []
+        
+        # Categorize versions
+        latest_release = None
+        latest_snapshot = None
+        
+        for v in manifest["versions"]:
+            self.versions[v["id"]] = v["url"]
+            if v.get("sha1"):
+                self.version_sha1s[v["id"]] = v["sha1"]
+            
+            # Track latest versions
+            if v["id"] == manifest["latest"].get("release"):
+                latest_release = v["id"]
+                self.version_categories["Latest Release"].append(v["id"])
+            elif v["id"] == manifest["latest"].get("snapshot"):
+                latest_snapshot = v["id"]
+                self.version_categories["Latest Snapshot"].append(v["id"])
+            
+            # Categorize by type
+            if v["type"] == "release":
+                if v["id"] != latest_release:
+                    self.version_categories["Release"].append(v["id"])
+            elif v["type"] == "snapshot":
+                if v["id"] != latest_snapshot:
+                    self.version_categories["Snapshot"].append(v["id"])
+            elif v["type"] == "old_beta":
+                self.version_categories["Old Beta"].append(v["id"])
+            elif v["type"] == "old_alpha":
+                self.version_categories["Old Alpha"].append(v["id"])
+        self.version_categories["Modded"] = self.find_modded_versions()
+
+    def get_latest_java_url(self, major=21):
+        """Fetch the latest OpenJDK release (URL, version, SHA256) for a Java major version from Adoptium API."""
+        try:
+            response = get_http_session().get(mirror_url(f"https://api.adoptium.net/v3/assets/latest/{major}/hotspot"),
+                                              params={"image_type": "jdk"},
+                                              timeout=(HTTP_CONNECT_TIMEOUT, HTTP_API_TIMEOUT))
+            response.raise_for_status()
+            releases = response.json()
+            system = platform.system()
+            arch = "x64"
+            os_map = {"Windows": "windows", "Linux": "linux", "Darwin": "mac"}
+            os_name = os_map.get(system, None)
+            if not os_name:
+                return None, None, None
+            for release in releases:
+                if (release["binary"]["os"] == os_name and release["binary"]["architecture"] == arch
+                        and release["binary"].get("image_type", "jdk") == "jdk"):
+                    package = release["binary"]["package"]
+                    return package["link"], release["version"]["openjdk_version"], package.get("checksum")
+            return None, None, None
+        except Exception as e:
+            print(f"❌ Failed to fetch latest Java {major} version: {e}")
+            return None, None, None
+
+    def get_required_java_major(self, version_data):
+        """Return the Java major version a game version asks for in its javaVersion field."""
+        return int(version_data.get("javaVersion", {}).get("majorVersion", DEFAULT_JAVA_MAJOR))
+
+    @traced("install_java_if_needed")
+    def install_java_if_needed(self, major=21):
+        """Return a Java binary for the given major version, installing OpenJDK under JAVA_DIR if needed.
+
+        Runtimes live side by side in JAVA_DIR (one directory per release) and are shared by
+        every game version that needs the same major version.
+        """
+        with self.java_install_lock:
+            return self.install_java_locked(major)
+
+    def install_java_locked(self, major):
+        """install_java_if_needed body, run while no other install of Java is in progress."""
+        java_bin = self.java_runtimes.find(major, exact=True)
+        if java_bin:
+            print(f"✅ Java {major} is already installed!")
+            return java_bin
+        print(f"Installing OpenJDK {major}...")
+        java_url, java_version, java_sha256 = self.get_latest_java_url(major)
+        if not java_url:
+            self.show_error("CTLauncher Error", f"Unsupported OS or failed to fetch the Java {major} URL!")
+            return None
+        os.makedirs(JAVA_DIR, exist_ok=True)
+        if JAVA_STREAMING_INSTALL:
+            installed = self.stream_install_java(java_url, major, java_sha256)
+        else:
+            installed = self.download_and_extract_java(java_url, major)
+        if not installed:
+            return None
+        self.java_runtimes.refresh()
+        java_bin = self.java_runtimes.find(major, exact=True)
+        if not java_bin:
+            self.show_error("CTLauncher Error", f"Java {major} was installed but its binary could not be found.")
+            return None
+        print(f"✅ Java {java_version} installed locally!")
+        return java_bin
+
+    def download_and_extract_java(self, java_url, major):
+        """Install a JDK by saving the whole archive to JAVA_DIR first, then extracting it."""
+        archive_ext = "zip" if platform.system() == "Windows" else "tar.gz"
+        archive_path = os.path.join(JAVA_DIR, f"openjdk-{major}.{archive_ext}")
+        # Use download_with_retry for Java installation
+        if not self.download_with_retry(java_url, archive_path, f"Java {major}"):
+            self.show_error("CTLauncher Error",
+                            f"Failed to download Java {major}. Please check your internet connection or install Java manually.")
+            return False
+        try:
+            if platform.system() == "Windows":
+                with zipfile.ZipFile(archive_path, "r") as zip_ref:
+                    zip_ref.extractall(JAVA_DIR)
+            else:
+                with tarfile.open(archive_path, "r:gz") as tar_ref:
+                    top_dirs = {name.split("/")[0] for name in tar_ref.getnames() if name.strip("/")}
+                    tar_ref.extractall(JAVA_DIR)
+                for top_dir in top_dirs:
+                    self.make_java_executable(os.path.join(JAVA_DIR, top_dir))
+        except Exception as e:
+            print(f"❌ Failed to extract Java: {e}")
+            self.show_error("CTLauncher Error",
+                            f"Failed to extract Java {major}: {str(e)}.\n\nPlease try again or install Java manually.")
+            return False
+        finally:
+            if os.path.exists(archive_path):
+                os.remove(archive_path)  # Cleanup archive
+        return True
+
+    @traced("stream_install_java")
+    def stream_install_java(self, java_url, major, expected_sha256=None):
+        """Install a JDK by piping the download straight into the extractor.
+
+        The archive is unpacked into a staging directory inside JAVA_DIR while its SHA256 is
+        computed, checked against Adoptium's published checksum, and only then moved into
+        place with os.replace. Zip archives (Windows) keep their central directory at the end,
+        so they are spooled to a file in the staging directory and extracted from there.
+        """
+        for leftover in os.listdir(JAVA_DIR):
+            if leftover.startswith(".staging-"):
+                shutil.rmtree(os.path.join(JAVA_DIR, leftover), ignore_errors=True)
+        extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+        is_zip = platform.system() == "Windows"
+        
+        reported = 0  # bytes of the current attempt already counted in self.progress
+        total = None  # archive size, added to the progress total on the first response only
+        
+        def on_read(num_bytes):
+            nonlocal reported
+            self.check_cancelled()
+            self.progress.advance(num_bytes)
+            reported += num_bytes
+        
+        for attempt in range(MAX_RETRIES):
+            self.check_cancelled()
+            reported, installed = 0, False
+            staging_dir = tempfile.mkdtemp(prefix=f".staging-java{major}-", dir=JAVA_DIR)
+            try:
+                print(f"📥 Downloading and extracting Java {major} (attempt {attempt + 1}/{MAX_RETRIES})...")
+                with get_http_session().get(mirror_url(java_url), stream=True,
+                                            timeout=(HTTP_CONNECT_TIMEOUT, DOWNLOAD_TIMEOUT)) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    if total is None:
+                        total = int(response.headers.get("Content-Length", 0))
+                        self.progress.start_phase("java", total)
+                    else:
+                        self.progress.start_phase("java")
+                    reader = HashingReader(response.raw, hashlib.sha256(), on_read)
+                    if is_zip:
+                        spool_path = os.path.join(staging_dir, "archive.zip")
+                        with open(spool_path, "wb") as spool:
+                            shutil.copyfileobj(reader, spool, DOWNLOAD_CHUNK_SIZE)
+                    else:
+                        with tarfile.open(fileobj=reader, mode="r|gz") as tar_ref:
+                            tar_ref.extractall(staging_dir, **extract_kwargs)
+                        reader.drain()
+                
+                if expected_sha256 and reader.hasher.hexdigest() != expected_sha256:
+                    print(f"⚠️ Checksum mismatch for Java {major}, retrying...")
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    self.sleep_unless_cancelled(RETRY_DELAY * (attempt + 1))
+                    continue
+                
+                if is_zip:
+                    with zipfile.ZipFile(spool_path, "r") as zip_ref:
+                        zip_ref.extractall(staging_dir)
+                    os.remove(spool_path)
+                
+                # Swap each extracted runtime directory into JAVA_DIR
+                for name in os.listdir(staging_dir):
+                    self.make_java_executable(os.path.join(staging_dir, name))
+                    target = os.path.join(JAVA_DIR, name)
+                    if os.path.exists(target):
+                        os.replace(target, os.path.join(staging_dir, f"{name}.old"))
+                    os.replace(os.path.join(staging_dir, name), target)
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                installed = True
+                return True
+            
+            except TaskCancelled:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            except (requests.RequestException, ConnectionError, TimeoutError, tarfile.ReadError, EOFError) as e:
+                print(f"⚠️ Network error downloading Java {major}: {e}")
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                if attempt < MAX_RETRIES - 1:
+                    wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
+                    print(f"🔄 Retrying in {wait_time} seconds...")
+                    self.sleep_unless_cancelled(wait_time)
+            except Exception as e:
+                print(f"❌ Failed to extract Java: {e}")
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                self.show_error("CTLauncher Error",
+                                f"Failed to extract Java {major}: {str(e)}.\n\nPlease try again or install Java manually.")
+                return False
+            finally:
+                if not installed:  # take the failed attempt's bytes back out while the phase is open
+                    self.progress.advance(-reported, downloaded=False)
+                self.progress.end_phase("java")
+        
+        print(f"❌ Failed to install Java {major} after {MAX_RETRIES} attempts")
+        self.show_error("CTLauncher Error",
+                        f"Failed to download Java {major}. Please check your internet connection or install Java manually.")
+        return False
+
+    @staticmethod
+    def make_java_executable(runtime_dir):
+        """Make sure the java launcher of an extracted runtime has its executable bit set."""
+        if platform.system() == "Windows":
+            return
+        for bin_dir in (("bin",), ("Contents", "Home", "bin")):
+            java_bin = os.path.join(runtime_dir, *bin_dir, "java")
+            if os.path.exists(java_bin):
+                os.chmod(java_bin, 0o755)  # Make Java executable
+
+    @staticmethod
+    def hash_file(file_path):
+        """Return the SHA1 hex digest of a file, read in VERIFY_CHUNK_SIZE pieces."""
+        sha1 = hashlib.sha1()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(VERIFY_CHUNK_SIZE), b""):
+                sha1.update(chunk)  # hashlib releases the GIL, so other threads hash in parallel
+            TRACER.count("bytes_hashed", f.tell())
+        return sha1.hexdigest()
+
+    @staticmethod
+    @traced("verify_file")
+    def verify_file(file_path, expected_sha1, expected_size=None):
+        """Verify the SHA1 checksum of a file, failing fast when expected_size is known and differs."""
+        try:
+            if expected_size and os.path.getsize(file_path) != expected_size:
+                TRACER.count("size_mismatches")
+                return False
+            return LauncherCore.hash_file(file_path) == expected_sha1
+        except Exception as e:
+            print(f"❌ Failed to verify file {file_path}: {e}")
+            return False
+
+    def is_file_verified(self, file_path, expected_sha1, expected_size=None):
+        """Check a file's SHA1, trusting the verified-file index for unchanged files unless deep verify is on."""
+        if not os.path.exists(file_path):
+            return False
+        if not self.deep_verify and self.verified_files.lookup(file_path, expected_sha1):
+            TRACER.count("verify_index_hits")
+            return True
+        TRACER.count("verify_index_misses")
+        if self.verify_file(file_path, expected_sha1, expected_size):
+            self.verified_files.record(file_path, expected_sha1)
+            return True
+        self.verified_files.forget(file_path)
+        return False
+
+    def queue_asset_jobs(self, index_job, scheduler):
+        """Queue the asset index download; once it is in place, queue every asset object.
+
+        index_job is the asset index job from version_file_jobs (None if the version has no
+        assets). Returns a dict whose "ok" turns False if the index cannot be downloaded or
+        read, and whose "downloaded"/"total" count asset objects.
+        """
+        result = {"ok": True, "downloaded": 0, "total": 0}
+        if not index_job:
+            print("⚠️ No asset index found, skipping assets.")
+            return result
+
+        def on_object_done(job, ok):
+            if ok is False:
+                print(f"⚠️ Failed to download asset {job['name']}, continuing...")
+            elif ok:
+                result["downloaded"] += 1
+                print(f"📥 Assets: {result['downloaded']}/{result['total']} downloaded")
+
+        def on_index_done(job, ok):
+            if ok is False:
+                result["ok"] = False
+                return
+            try:
+                with open(index_job["path"], "r") as f:
+                    objects = json.load(f)["objects"]
+            except Exception as e:
+                print(f"❌ Failed to read asset index: {e}")
+                result["ok"] = False
+                return
+            jobs = self.asset_object_jobs(objects)
+            result["total"] = len(jobs)
+            for obj_job in jobs:
+                obj_job.update(priority=PRIORITY_ASSET, phase="assets", on_done=on_object_done)
+                scheduler.submit(obj_job)
+
+        scheduler.submit(dict(index_job, priority=PRIORITY_CRITICAL, phase="assets", on_done=on_index_done))
+        return result
+
+    @staticmethod
+    def asset_object_jobs(objects):
+        """Return one download job per distinct object hash in an asset index's "objects" dict.
+
+        Several asset names can point at the same object, so each hash is listed once.
+        """
+        jobs = {}
+        for obj_name, obj_info in objects.items():
+            obj_hash = obj_info["hash"]
+            if obj_hash not in jobs:
+                jobs[obj_hash] = {
+                    "url": f"https://resources.download.minecraft.net/{obj_hash[:2]}/{obj_hash}",
+                    "path": os.path.join(ASSETS_DIR, "objects", obj_hash[:2], obj_hash),
+                    "description": f"asset {obj_name}",
+                    "sha1": obj_hash,
+                    "size": obj_info.get("size", 0),
+                    "name": obj_name,
+                    "kind": "asset"
+                }
+        return list(jobs.values())
+
+    def version_file_jobs(self, data, version_id):
+        """Return download jobs for a resolved version's client JAR, libraries, native JARs and asset index.
+
+        This is the single description of where a version's files live on this OS; installs
+        add scheduling keys to these jobs and verification checks them as they are. Every job
+        has url, path, description, sha1, size, name and kind ("jar", "library", "native" or
+        "asset_index") keys; library and native jobs also carry their "library" entry.
+        """
+        current_os, arch_bits = game_platform()
+        libraries_dir = os.path.join(CTLAUNCHER_DIR, "libraries")
+        jar_id = data.get("jar", version_id)  # modded profiles use their parent's JAR
+        client = data.get("downloads", {}).get("client", {})
+        jobs = [{"url": client.get("url"), "path": os.path.join(VERSIONS_DIR, jar_id, f"{jar_id}.jar"),
+                 "description": f"{jar_id} JAR", "sha1": client.get("sha1"), "size": client.get("size", 0),
+                 "name": jar_id, "kind": "jar"}]
+        
+        for lib in data.get("libraries", []):
+            if not self.is_library_allowed(lib, current_os):
+                continue
+            lib_name = lib.get("name", "unknown")
+            artifact = self.library_artifact(lib)
+            if artifact and artifact.get("url"):
+                jobs.append({"url": artifact["url"], "path": os.path.join(libraries_dir, artifact["path"]),
+                             "description": f"library {lib_name}", "sha1": artifact.get("sha1"),
+                             "size": artifact.get("size", 0), "name": lib_name, "kind": "library", "library": lib})
+            if "natives" in lib and current_os in lib["natives"]:
+                classifier = lib["natives"][current_os].replace("${arch}", arch_bits)
+                native_info = lib.get("downloads", {}).get("classifiers", {}).get(classifier)
+                if native_info:
+                    jobs.append({"url": native_info["url"],
+                                 "path": os.path.join(libraries_dir, native_info.get("path") or os.path.join(
+                                     "natives", f"{classifier}-{native_info['sha1']}.jar")),
+                                 "description": f"native {lib_name}", "sha1": native_info["sha1"],
+                                 "size": native_info.get("size", 0), "name": lib_name, "kind": "native",
+                                 "library": lib})
+        
+        asset_index = data.get("assetIndex")
+        if asset_index:
+            jobs.append({"url": asset_index["url"],
+                         "path": os.path.join(ASSETS_DIR, "indexes", f"{asset_index['id']}.json"),
+                         "description": "asset index", "sha1": asset_index["sha1"],
+                         "size": asset_index.get("size", 0), "name": "asset index", "kind": "asset_index"})
+        return jobs
+
+    def fetch_version_json(self, version_id, version_url):
+        """Make sure a version JSON is current, using the manifest's sha1 when it has one.
+
+        Returns None if the installed JSON already matched, otherwise the download result.
+        Without a known sha1 the JSON is always downloaded again.
+        """
+        json_path = os.path.join(VERSIONS_DIR, version_id, f"{version_id}.json")
+        expected_sha1 = self.version_sha1s.get(version_id)
+        if not expected_sha1:
+            os.makedirs(os.path.dirname(json_path), exist_ok=True)
+            return self.download_with_retry(version_url, json_path, f"{version_id} JSON")
+        return self.fetch_file({"url": version_url, "path": json_path, "description": f"{version_id} JSON",
+                                "sha1": expected_sha1})
+
+    def save_install_record(self, version_id, verified_at=None):
+        """Remember the complete file set of a version with sizes and mtimes, for the fast launch path."""
+        natives_dir = os.path.join(VERSIONS_DIR, version_id, "natives")
+        try:
+            paths = [job["path"] for job in self.list_version_files(version_id)]
+            paths += [source["path"] for source in self.resolve_version(version_id)[1]]
+            for names in self.load_natives_record(natives_dir).values():
+                paths += [os.path.join(natives_dir, name) for name in names]
+            files = {}
+            for path in paths:
+                st = os.stat(path)
+                files[path] = [st.st_size, st.st_mtime_ns]
+        except Exception as e:
+            print(f"⚠️ Could not record the install of {version_id}: {e}")
+            self.forget_install_record(version_id)
+            return
+        record = {"json_sha1": self.version_sha1s.get(version_id), "verified_at": verified_at or time.time(),
+                  "files": files}
+        self.save_json_cache(os.path.join(VERSIONS_DIR, version_id, INSTALL_RECORD_NAME), record)
+
+    @staticmethod
+    def load_install_record(version_id):
+        """Return the last known good record of a version, or None."""
+        try:
+            with open(os.path.join(VERSIONS_DIR, version_id, INSTALL_RECORD_NAME), "r") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    @staticmethod
+    def forget_install_record(version_id):
+        """Drop the last known good record so the next launch runs the full install."""
+        record_path = os.path.join(VERSIONS_DIR, version_id, INSTALL_RECORD_NAME)
+        if os.path.exists(record_path):
+            os.remove(record_path)
+
+    def is_install_current(self, version_id):
+        """True if every file of the last complete install is still there with the same size and mtime.
+
+        A newer version JSON in the manifest also invalidates the record.
+        """
+        record = self.load_install_record(version_id)
+        if not record or not record.get("files"):
+            return False
+        expected_sha1 = self.version_sha1s.get(version_id)
+        if expected_sha1 and record.get("json_sha1") and expected_sha1 != record["json_sha1"]:
+            return False
+        for path, (size, mtime_ns) in record["files"].items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                return False
+        return True
+
+    def verify_in_background(self, version_id):
+        """Verify a fast-launched version on a worker thread; returns the thread.
+
+        Uses the verified-file index normally and rehashes everything once the last full check
+        is older than FULL_VERIFY_INTERVAL. Damaged files drop the last known good record, so
+        the next launch repairs them.
+        """
+        def run():
+            worker = LauncherCore(shared=self)
+            worker.cancel_event = threading.Event()  # A new launch must not cancel this check
+            record = self.load_install_record(version_id) or {}
+            worker.deep_verify = time.time() - record.get("verified_at", 0) > FULL_VERIFY_INTERVAL
+            try:
+                failures = worker.verify_version(version_id)
+            except Exception as e:
+                print(f"⚠️ Background verification of {version_id} failed: {e}")
+                return
+            if failures:
+                print(f"⚠️ {len(failures)} files of {version_id} are missing or corrupt, they will be repaired next launch")
+                self.forget_install_record(version_id)
+            elif worker.deep_verify:
+                self.save_install_record(version_id)
+                print(f"✅ Full verification of {version_id} passed.")
+        
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def record_launch_metric(version_id, click_to_spawn, fast_path):
+        """Append the time from PLAY NOW to JVM spawn to LAUNCH_METRICS_PATH."""
+        print(f"⏱️ Click to JVM spawn: {click_to_spawn * 1000:.0f} ms ({'fast path' if fast_path else 'full install check'})")
+        try:
+            os.makedirs(os.path.dirname(LAUNCH_METRICS_PATH), exist_ok=True)
+            with open(LAUNCH_METRICS_PATH, "a") as f:
+                f.write(json.dumps({"time": time.time(), "version": version_id, "fast_path": fast_path,
+                                    "click_to_spawn": round(click_to_spawn, 4)}) + "\n")
+        except Exception as e:
+            print(f"⚠️ Failed to record launch metric: {e}")
+
+    def read_version_json(self, json_path):
+        """Parse a version JSON, reusing the parsed copy while the file is unchanged; callers must not modify it."""
+        st = os.stat(json_path)
+        cached = self.version_json_cache.get(json_path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            TRACER.count("version_json_cache_hits")
+            return cached[2]
+        TRACER.count("version_json_cache_misses")
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        self.version_json_cache[json_path] = (st.st_size, st.st_mtime_ns, data)
+        return data
+
+    @traced("download_version_files")
+    def download_version_files(self, version_id, version_url):
+        """Download the version JSON, JAR, libraries, natives, and assets with checksum verification."""
+        print(f"⬇️ Downloading version files for {version_id}...")
+        version_dir = os.path.join(VERSIONS_DIR, version_id)
+        os.makedirs(version_dir, exist_ok=True)
+        
+        # Download version JSON, then any inheritsFrom parents that are not installed yet.
+        # Installed modded profiles have no manifest URL and are used as they are on disk.
+        # A JSON that still matches the manifest's sha1 is not fetched again.
+        version_json_path = os.path.join(version_dir, f"{version_id}.json")
+        if version_url and self.fetch_version_json(version_id, version_url) is False:
+            if not os.path.exists(version_json_path):
+                self.show_error("CTLauncher Error", f"Failed to download version {version_id} JSON.")
+                return False
+            print(f"📴 Offline: using the installed {version_id} JSON.")
+        
+        try:
+            chain_ids = [version_id]
+            while True:
+                parent_id = self.read_version_json(
+                    os.path.join(VERSIONS_DIR, chain_ids[-1], f"{chain_ids[-1]}.json")).get("inheritsFrom")
+                if not parent_id or parent_id in chain_ids:
+                    break
+                parent_path = os.path.join(VERSIONS_DIR, parent_id, f"{parent_id}.json")
+                if not os.path.exists(parent_path):
+                    parent_url = self.versions.get(parent_id)
+                    if not parent_url:
+                        raise ValueError(f"parent version {parent_id} is not installed or in the manifest")
+                    if not self.fetch_version_json(parent_id, parent_url):
+                        raise ValueError(f"failed to download parent version {parent_id} JSON")
+                chain_ids.append(parent_id)
+            data, _ = self.resolve_version(version_id)
+        except Exception as e:
+            print(f"❌ Failed to read version JSON: {e}")
+            self.show_error("CTLauncher Error", f"Cannot read version {version_id} JSON.")
+            return False
+        
+        # Installs of the same version (a launch and the prefetch daemon) share its natives
+        # directory and natives record, so they take turns
+        with self.file_locks[os.path.abspath(version_dir)]:
+            return self.download_version_files_locked(version_id, data, version_dir)
+
+    def download_version_files_locked(self, version_id, data, version_dir):
+        """download_version_files body after the version JSONs, run while holding the version directory's lock."""
+        jobs = self.version_file_jobs(data, version_id)
+        jar_job = jobs[0]
+        if not jar_job["url"] or not jar_job["sha1"]:
+            print(f"❌ Missing client JAR info in JSON for {version_id}")
+            self.show_error("CTLauncher Error", f"Version {version_id} is missing client JAR information.")
+            return False
+        
+        scheduler = DownloadScheduler(self, self.max_download_workers)
+        phase_spans = TRACER.phase_spans()
+        self.progress.add_listener(phase_spans)
+        
+        # Client JAR: on the critical path, so it goes first
+        jar_job.update(priority=PRIORITY_CRITICAL, phase="jar")
+        scheduler.submit(jar_job)
+        
+        natives_dir = os.path.join(version_dir, "natives")
+        os.makedirs(natives_dir, exist_ok=True)
+        
+        def on_library_done(job, ok):
+            if ok is False:
+                print(f"⚠️ Warning: Failed to download library {job['name']}, continuing...")
+        
+        for job in jobs:
+            if job["kind"] == "library":
+                job.update(priority=PRIORITY_LIBRARY, phase="libraries", on_done=on_library_done)
+                scheduler.submit(job)
+        
+        # Natives: native JARs are kept under libraries and the files extracted from each one
+        # are recorded by its SHA1, so unchanged natives are skipped. Each native is extracted
+        # as soon as its download finishes.
+        natives_record = self.load_natives_record(natives_dir)
+        wanted = set()
+        
+        def on_native_done(job, ok):
+            if ok is False:
+                print(f"⚠️ Warning: Failed to download native {job['name']}, continuing...")
+                return
+            try:
+                extracted = self.extract_native_jar(job["path"], natives_dir, job["exclude"])
+                for name in extracted:
+                    file_path = os.path.join(natives_dir, name)
+                    if not self.blobs.available(file_path):
+                        break
+                    self.blobs.adopt(file_path, self.hash_file(file_path))
+                natives_record[job["sha1"]] = extracted
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to extract native {job['name']}: {e}")
+        
+        for job in jobs:
+            if job["kind"] != "native":
+                continue
+            wanted.add(job["sha1"])
+            extracted = natives_record.get(job["sha1"])
+            if (extracted is not None and not self.deep_verify
+                    and all(os.path.exists(os.path.join(natives_dir, name)) for name in extracted)):
+                continue
+            job.update(exclude=job["library"].get("extract", {}).get("exclude", []),
+                       priority=PRIORITY_LIBRARY, phase="natives", on_done=on_native_done)
+            scheduler.submit(job)
+        
+        # Assets: thousands of small objects, queued behind the critical-path work
+        assets = self.queue_asset_jobs(next((job for job in jobs if job["kind"] == "asset_index"), None), scheduler)
+        
+        try:
+            failed = scheduler.run()
+        finally:
+            self.progress.remove_listener(phase_spans)
+            self.verified_files.save()
+        
+        if not assets["ok"]:
+            self.show_warning("CTLauncher Warning", "Failed to download some assets. Game may have missing textures/sounds.")
+        else:
+            print(f"✅ Assets downloaded: {assets['downloaded']}/{assets['total']}")
+        if jar_job in failed:
+            self.show_error("CTLauncher Error", f"Failed to download version {version_id} JAR.")
+            return False
+        
+        # Remove files extracted from natives this version no longer uses
+        for stale_sha1 in set(natives_record) - wanted:
+            for name in natives_record.pop(stale_sha1):
+                if os.path.isfile(os.path.join(natives_dir, name)):
+                    os.remove(os.path.join(natives_dir, name))
+        self.save_natives_record(natives_dir, natives_record)
+        if not failed and assets["ok"]:
+            self.save_install_record(version_id)
+        else:
+            self.forget_install_record(version_id)
+        self.progress.finish()
+        
+        timings = ", ".join(f"{name} {secs:.2f}s" for name, secs in self.progress.phase_times.items())
+        print(f"⏱️ Phase timings: {timings}")
+        print("✅ Download complete! Ready to play!")
+        return True
+
+    def list_version_files(self, version_id):
+        """Return download jobs for every checksummed file an installed version needs on this OS.
+
+        Covers the client JAR, libraries, native JARs, the asset index and, when the index is
+        on disk, its asset objects.
+        """
+        data, _ = self.resolve_version(version_id)
+        files = self.version_file_jobs(data, version_id)
+        index_job = next((job for job in files if job["kind"] == "asset_index"), None)
+        if index_job and os.path.exists(index_job["path"]):
+            try:
+                with open(index_job["path"], "r") as f:
+                    objects = json.load(f).get("objects", {})
+            except ValueError as e:  # a damaged index is itself reported; its objects are checked once it is fixed
+                print(f"⚠️ Skipping asset objects, unreadable asset index: {e}")
+                objects = {}
+            files.extend(self.asset_object_jobs(objects))
+        return files
+
+    @traced("verify_version")
+    def verify_version(self, version_id):
+        """Check every file of an installed version; returns the jobs whose file is missing or corrupt."""
+        return self.verify_files(self.list_version_files(version_id))
+
+    @traced("verify_files")
+    def verify_files(self, jobs, max_workers=None):
+        """Check many files at once; returns the jobs whose file is missing, the wrong size or corrupt.
+
+        Jobs are download job dicts with path, sha1 and size keys (size 0 for unknown), so the
+        failures can go straight to download_many. Missing files and size mismatches are caught
+        with a stat and files the verified-file index vouches for are skipped (unless deep
+        verify is on); only the rest are hashed, largest first, on a pool of MAX_VERIFY_WORKERS
+        threads. Failures come back in the order of jobs.
+        """
+        jobs = list(jobs)
+        failed, to_hash = set(), []
+        try:
+            for i, job in enumerate(jobs):
+                self.check_cancelled()
+                path, sha1, size = job["path"], job.get("sha1"), job.get("size")
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    failed.add(i)
+                    continue
+                if size and st.st_size != size:
+                    TRACER.count("size_mismatches")
+                    self.verified_files.forget(path)
+                    failed.add(i)
+                elif sha1 and (self.deep_verify or not self.verified_files.lookup(path, sha1)):
+                    to_hash.append((i, job))
+                elif sha1:
+                    TRACER.count("verify_index_hits")
+            TRACER.count("verify_index_misses", len(to_hash))
+            
+            def check(item):
+                self.check_cancelled()
+                path, sha1 = item[1]["path"], item[1]["sha1"]
+                if self.verify_file(path, sha1):
+                    self.verified_files.record(path, sha1)
+                    return True
+                self.verified_files.forget(path)
+                return False
+            
+            to_hash.sort(key=lambda item: item[1].get("size") or 0, reverse=True)
+            with ThreadPoolExecutor(max_workers=max(1, max_workers or MAX_VERIFY_WORKERS), initializer=TRACER.adopt,
+                                    initargs=(TRACER.current(),)) as executor:
+                for (i, _), ok in zip(to_hash, executor.map(check, to_hash)):
+                    if not ok:
+                        failed.add(i)
+        finally:
+            self.verified_files.save()
+        return [job for i, job in enumerate(jobs) if i in failed]
+
+    def export_bundle(self, version_ids, bundle_path, include_java=True):
+        """Write installed versions and everything they need into one offline bundle (a zip file).
+
+        Files are stored under their upstream <host>/<path>, so an unpacked bundle can also be
+        served as MIRROR_BASE_URL; a version manifest listing the bundled versions goes
+        alongside. BUNDLE_INDEX_NAME maps every entry to its place under CTLAUNCHER_DIR with
+        its SHA1. Files without a URL (modded profiles, the Java runtime) go under files/.
+        Returns the number of files written.
+        """
+        entries = {}  # bundle name -> index entry
+        manifest = {"latest": {}, "versions": []}
+        sources = {}  # bundle name -> file on disk
+        
+        def add(path, url=None, sha1=None):
+            name = mirror_path(url) if url else "files/" + os.path.relpath(path, CTLAUNCHER_DIR).replace(os.sep, "/")
+            if name not in entries:
+                entries[name] = {"name": name, "dest": os.path.relpath(path, CTLAUNCHER_DIR).replace(os.sep, "/"),
+                                 "sha1": sha1, "size": os.path.getsize(path)}
+                sources[name] = path
+        
+        for version_id in version_ids:
+            failures = self.verify_version(version_id)
+            if failures:
+                raise ValueError(f"{version_id} has {len(failures)} missing or corrupt files, install it first")
+            for json_path, data in self.load_version_chain(version_id):
+                version_url = self.versions.get(data["id"])
+                with open(json_path, "rb") as f:
+                    json_sha1 = hashlib.sha1(f.read()).hexdigest()
+                add(json_path, version_url, json_sha1)
+                if version_url:
+                    manifest["versions"].append({"id": data["id"], "type": data.get("type", "release"),
+                                                 "url": version_url, "sha1": json_sha1})
+            for job in self.list_version_files(version_id):
+                add(job["path"], job["url"], job["sha1"])
+            if include_java:
+                major = self.get_required_java_major(self.resolve_version(version_id)[0])
+                java_bin = self.java_runtimes.find(major, exact=True)
+                rel = os.path.relpath(os.path.realpath(java_bin), os.path.realpath(JAVA_DIR)) if java_bin else ".."
+                if rel.startswith(".."):
+                    print(f"⚠️ Java {major} is not installed under {JAVA_DIR}, leaving it out of the bundle")
+                    continue
+                runtime_dir = os.path.join(JAVA_DIR, rel.split(os.sep)[0])
+                for dirpath, _, filenames in os.walk(runtime_dir):
+                    for file_name in filenames:
+                        add(os.path.join(dirpath, file_name))
+        
+        index = {"format": BUNDLE_FORMAT, "versions": list(version_ids), "entries": list(entries.values())}
+        os.makedirs(os.path.dirname(os.path.abspath(bundle_path)), exist_ok=True)
+        tmp_path = bundle_path + ".part"
+        # Game files are already compressed (JARs, ogg, png), so store them as they are
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as bundle:
+            for name, path in sources.items():
+                self.check_cancelled()
+                bundle.write(path, name)
+            manifest_versions = {v["id"]: v for v in manifest["versions"]}
+            manifest["versions"] = list(manifest_versions.values())
+            bundle.writestr(mirror_path(VERSION_MANIFEST_URL), json.dumps(manifest))
+            bundle.writestr(BUNDLE_INDEX_NAME, json.dumps(index))
+        os.replace(tmp_path, bundle_path)
+        print(f"📦 Exported {len(sources)} files for {', '.join(version_ids)} to {bundle_path}")
+        return len(sources)
+
+    def import_bundle(self, bundle_path):
+        """Unpack an offline bundle into CTLAUNCHER_DIR in one pass; returns (files written, files already present).
+
+        Every entry is streamed to a .part file, checked against its SHA1 and renamed into
+        place; files that are already present and verified are skipped. Bundled versions are
+        added to the cached version manifest so they show up without a network connection.
+        """
+        written, present = 0, 0
+        root = os.path.realpath(CTLAUNCHER_DIR)
+        with zipfile.ZipFile(bundle_path, "r") as bundle:
+            index = json.loads(bundle.read(BUNDLE_INDEX_NAME))
+            if index.get("format") != BUNDLE_FORMAT:
+                raise ValueError(f"unsupported bundle format {index.get('format')}")
+            for entry in index["entries"]:
+                self.check_cancelled()
+                dest = os.path.realpath(os.path.join(root, entry["dest"]))
+                if not dest.startswith(root + os.sep):
+                    raise ValueError(f"bundle entry {entry['name']} points outside {CTLAUNCHER_DIR}")
+                if os.path.exists(dest) and (not entry["sha1"] or self.is_file_verified(dest, entry["sha1"])):
+                    present += 1
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                info = bundle.getinfo(entry["name"])
+                sha1 = hashlib.sha1()
+                with bundle.open(info) as src, open(dest + ".part", "wb") as out_file:
+                    for chunk in iter(lambda: src.read(DOWNLOAD_CHUNK_SIZE), b""):
+                        sha1.update(chunk)
+                        out_file.write(chunk)
+                if entry["sha1"] and sha1.hexdigest() != entry["sha1"]:
+                    os.remove(dest + ".part")
+                    raise ValueError(f"checksum mismatch for {entry['name']} in bundle")
+                mode = (info.external_attr >> 16) & 0o777
+                if mode:
+                    os.chmod(dest + ".part", mode)
+                os.replace(dest + ".part", dest)
+                if entry["sha1"]:
+                    self.verified_files.record(dest, entry["sha1"])
+                    self.blobs.adopt(dest, entry["sha1"])
+                written += 1
+            bundled_manifest = json.loads(bundle.read(mirror_path(VERSION_MANIFEST_URL)))
+        self.verified_files.save()
+        self.java_runtimes.refresh()
+        
+        manifest = {"latest": {}, "versions": []}
+        if os.path.exists(MANIFEST_CACHE_PATH):
+            with open(MANIFEST_CACHE_PATH, "r") as f:
+                manifest = json.load(f)
+        known = {v["id"] for v in manifest["versions"]}
+        manifest["versions"] += [v for v in bundled_manifest["versions"] if v["id"] not in known]
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(MANIFEST_CACHE_PATH, "w") as f:
+            json.dump(manifest, f)
+        self.post_to_ui(self.apply_version_manifest, manifest)
+        print(f"📦 Imported {written} files from {bundle_path} ({present} already present)")
+        return written, present
+
+    @staticmethod
+    def extract_native_jar(jar_path, natives_dir, exclude=()):
+        """Extract a native JAR into natives_dir, skipping entries under its extract.exclude prefixes.
+
+        Returns the extracted file names relative to natives_dir.
+        """
+        extracted = []
+        with zipfile.ZipFile(jar_path, "r") as zip_ref:
+            for member in zip_ref.infolist():
+                if member.is_dir() or any(member.filename.startswith(prefix) for prefix in exclude):
+                    continue
+                target = os.path.join(natives_dir, member.filename)
+                if os.path.exists(target):
+                    os.remove(target)  # Never write through a hardlink into the blob store
+                zip_ref.extract(member, natives_dir)
+                extracted.append(member.filename)
+        return extracted
+
+    @staticmethod
+    def load_natives_record(natives_dir):
+        """Return {native JAR sha1: [extracted file names]} for a natives directory."""
+        try:
+            with open(os.path.join(natives_dir, NATIVES_RECORD_NAME), "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    @staticmethod
+    def save_natives_record(natives_dir, record):
+        """Persist the natives extraction record."""
+        try:
+            with open(os.path.join(natives_dir, NATIVES_RECORD_NAME), "w") as f:
+                json.dump(record, f)
+        except Exception as e:
+            print(f"⚠️ Failed to save natives record: {e}")
+
+    @staticmethod
+    def list_instances():
+        """Return the default instance followed by the named instances on disk."""
+        names = sorted(os.listdir(INSTANCES_DIR)) if os.path.isdir(INSTANCES_DIR) else []
+        return [DEFAULT_INSTANCE] + [name for name in names if os.path.isdir(os.path.join(INSTANCES_DIR, name))]
+
+    @staticmethod
+    def instance_game_dir(name):
+        """Return the game directory of an instance; versions, libraries and assets stay shared."""
+        name = re.sub(r"[^A-Za-z0-9_. -]", "_", name or "").strip(". ")
+        if not name or name == DEFAULT_INSTANCE:
+            return CTLAUNCHER_DIR
+        return os.path.join(INSTANCES_DIR, name)
+
+    def create_game_directories(self):
+        """Create all necessary game directories and initialize logs."""
+        os.makedirs(os.path.join(self.game_dir, "logs"), exist_ok=True)
+        os.makedirs(os.path.join(self.game_dir, "crash-reports"), exist_ok=True)
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        os.makedirs(os.path.join(ASSETS_DIR, "indexes"), exist_ok=True)
+        os.makedirs(os.path.join(ASSETS_DIR, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(self.game_dir, "saves"), exist_ok=True)
+        os.makedirs(os.path.join(self.game_dir, "resourcepacks"), exist_ok=True)
+        os.makedirs(os.path.join(CTLAUNCHER_DIR, "skins"), exist_ok=True)
+
+        # Initialize logs/latest.log to avoid access denied
+        log_path = os.path.join(self.game_dir, "logs", "latest.log")
+        if not os.path.exists(log_path):
+            with open(log_path, "w") as f:
+                f.write("")  # Empty file
+        print("📁 Game directories and logs initialized.")
+
+    def modify_options_txt(self, target_fps=60):
+        """Modify options.txt to set maxFps and disable vsync, preserving other settings."""
+        options_path = os.path.join(self.game_dir, "options.txt")
+        options = {}
+        if os.path.exists(options_path):
+            try:
+                with open(options_path, "r") as f:
+                    for line in f:
+                        parts = line.strip().split(":", 1)
+                        if len(parts) == 2:
+                            options[parts[0]] = parts[1]
+            except Exception as e:
+                print(f"⚠️ Could not read options.txt: {e}")
+        
+        options['maxFps'] = str(target_fps)
+        options['enableVsync'] = 'false'
+        
+        try:
+            os.makedirs(os.path.dirname(options_path), exist_ok=True)
+            with open(options_path, "w") as f:
+                for key, value in options.items():
+                    f.write(f"{key}:{value}\n")
+            print(f"⚙️ Set maxFps to {target_fps} and disabled vsync!")
+        except Exception as e:
+            print(f"❌ Failed to write options.txt: {e}")
+
+    @staticmethod
+    def library_artifact(lib):
+        """Return a library's artifact download info, deriving it from Maven coordinates when needed.
+
+        Vanilla libraries list downloads.artifact; Fabric and Quilt profiles only give a name
+        and a Maven repository url.
+        """
+        if "downloads" in lib and "artifact" in lib["downloads"]:
+            return lib["downloads"]["artifact"]
+        parts = lib.get("name", "").split(":")
+        if "url" not in lib or len(parts) < 3:
+            return None
+        group, artifact_id, version = parts[:3]
+        classifier = f"-{parts[3]}" if len(parts) > 3 else ""
+        path = "/".join(group.split(".") + [artifact_id, version, f"{artifact_id}-{version}{classifier}.jar"])
+        return {"path": path, "url": lib["url"].rstrip("/") + "/" + path,
+                "sha1": lib.get("sha1"), "size": lib.get("size", 0)}
+
+    def is_library_allowed(self, lib, current_os):
+        """Check if a library is allowed on the current OS based on its rules."""
+        if "rules" not in lib:
+            return True
+        allowed = False
+        for rule in lib["rules"]:
+            if rule["action"] == "allow":
+                if "os" not in rule or (isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os):
+                    allowed = True
+            elif rule["action"] == "disallow":
+                if "os" in rule and isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os:
+                    allowed = False
+        return allowed
+
+    def evaluate_rules(self, rules, current_os):
+        """Evaluate argument rules based on the current OS, ignoring feature-based rules."""
+        if not rules:
+            return True
+        allowed = False
+        for rule in rules:
+            if "features" in rule:
+                continue
+            if rule["action"] == "allow":
+                if "os" not in rule or (isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os):
+                    allowed = True
+            elif rule["action"] == "disallow":
+                if "os" in rule and isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os:
+                    allowed = False
+        return allowed
+
+    def generate_offline_uuid(self, username):
+        """Generate a UUID for offline mode based on the username."""
+        offline_prefix = "OfflinePlayer:"
+        hash_value = hashlib.md5((offline_prefix + username).encode('utf-8')).hexdigest()
+        uuid_str = f"{hash_value[:8]}-{hash_value[8:12]}-{hash_value[12:16]}-{hash_value[16:20]}-{hash_value[20:32]}"
+        return uuid_str
+
+    def find_modded_versions(self):
+        """List installed versions whose JSON inherits from another version."""
+        modded = []
+        if not os.path.isdir(VERSIONS_DIR):
+            return modded
+        for version_id in sorted(os.listdir(VERSIONS_DIR)):
+            json_path = os.path.join(VERSIONS_DIR, version_id, f"{version_id}.json")
+            try:
+                with open(json_path, "r") as f:
+                    if "inheritsFrom" in json.load(f):
+                        modded.append(version_id)
+            except Exception:
+                continue
+        return modded
+
+    @staticmethod
+    def snapshot_sources(paths):
+        """Record size, mtime and SHA1 of each file a cached result was derived from."""
+        sources = []
+        for path in paths:
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                sha1 = hashlib.sha1(f.read()).hexdigest()
+            sources.append({"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": sha1})
+        return sources
+
+    @staticmethod
+    def check_sources(sources):
+        """Return (unchanged, restamped) for recorded sources.
+
+        A stat is enough when size and mtime match; otherwise the file is rehashed and, if its
+        SHA1 still matches, the record is restamped in place so the next check is a stat again.
+        """
+        restamped = False
+        for source in sources:
+            try:
+                st = os.stat(source["path"])
+            except OSError:
+                return False, False
+            if st.st_size == source["size"] and st.st_mtime_ns == source["mtime_ns"]:
+                continue
+            with open(source["path"], "rb") as f:
+                if hashlib.sha1(f.read()).hexdigest() != source["sha1"]:
+                    return False, False
+            source.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            restamped = True
+        return True, restamped
+
+    def load_version_chain(self, version_id):
+        """Load a version JSON and its inheritsFrom parents, child first, as (path, data) pairs."""
+        chain = []
+        current = version_id
+        while current:
+            if len(chain) >= MAX_INHERITANCE_DEPTH or any(data.get("id") == current for _, data in chain):
+                raise ValueError(f"inheritsFrom chain of {version_id} is too deep or circular")
+            json_path = os.path.join(VERSIONS_DIR, current, f"{current}.json")
+            data = self.read_version_json(json_path)
+            if "id" not in data:
+                data = dict(data, id=current)
+            chain.append((json_path, data))
+            current = data.get("inheritsFrom")
+        return chain
+
+    @staticmethod
+    def library_key(lib):
+        """Identify a library by group, artifact and classifier, ignoring the version."""
+        parts = lib.get("name", "").split(":")
+        return tuple(parts[:2] + parts[3:])
+
+    @classmethod
+    def merge_version_data(cls, child, parent):
+        """Merge a child version JSON onto its parent the way the official launcher does.
+
+        Child fields override the parent's, child libraries come first and replace parent
+        libraries with the same group/artifact, and JVM/game argument lists are concatenated.
+        """
+        merged = dict(parent)
+        for key, value in child.items():
+            if key == "libraries":
+                child_keys = {cls.library_key(lib) for lib in value}
+                merged["libraries"] = list(value) + [lib for lib in parent.get("libraries", [])
+                                                     if cls.library_key(lib) not in child_keys]
+            elif key == "arguments":
+                arguments = dict(parent.get("arguments", {}))
+                for kind, args in value.items():
+                    arguments[kind] = arguments.get(kind, []) + args
+                merged["arguments"] = arguments
+            elif key != "inheritsFrom":
+                merged[key] = value
+        merged["jar"] = child.get("jar") or parent.get("jar") or parent["id"]
+        return merged
+
+    def resolve_version(self, version_id):
+        """Return (data, sources) for a version with its inheritsFrom chain merged.
+
+        Results are kept in memory for the session, and merged results are also cached in
+        versions/<version>/<version>.merged.json; both are reused while every JSON in the chain
+        is unchanged. sources lists those files for callers that cache their own derived data.
+        """
+        resolved = self.resolved_versions.get(version_id)
+        if resolved and self.check_sources(resolved[1])[0]:
+            return resolved
+        
+        version_dir = os.path.join(VERSIONS_DIR, version_id)
+        merged_path = os.path.join(version_dir, f"{version_id}{MERGED_VERSION_SUFFIX}")
+        
+        if os.path.exists(merged_path):
+            try:
+                with open(merged_path, "r") as f:
+                    cached = json.load(f)
+                unchanged, restamped = self.check_sources(cached["sources"])
+                if unchanged:
+                    if restamped:
+                        self.save_json_cache(merged_path, cached)
+                    self.resolved_versions[version_id] = (cached["data"], cached["sources"])
+                    return self.resolved_versions[version_id]
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable merged version cache: {e}")
+        
+        chain = self.load_version_chain(version_id)
+        sources = self.snapshot_sources([path for path, _ in chain])
+        if len(chain) == 1:
+            self.resolved_versions[version_id] = (chain[0][1], sources)
+            return self.resolved_versions[version_id]
+        
+        print(f"🧩 Merging {version_id} with {' -> '.join(data['id'] for _, data in chain[1:])}")
+        data = chain[-1][1]
+        for _, child in reversed(chain[:-1]):
+            data = self.merge_version_data(child, data)
+        self.save_json_cache(merged_path, {"sources": sources, "data": data})
+        self.resolved_versions[version_id] = (data, sources)
+        return data, sources
+
+    def get_launch_plan(self, version):
+        """Return the compiled launch plan for a version on this OS, compiling it only when needed.
+
+        Plans are cached in memory and in versions/<version>/launch_plan-<os>.json, and are
+        invalidated when any version JSON in the inheritsFrom chain changes (see check_sources).
+        Plans that had to leave out missing libraries are always recompiled so the classpath
+        picks them up once present.
+        """
+        current_os, _ = game_platform()
+        plan_path = os.path.join(VERSIONS_DIR, version, f"launch_plan-{current_os}.json")
+        
+        plan = self.launch_plans.get((version, current_os))
+        source = "memory"
+        if plan is None and os.path.exists(plan_path):
+            source = "disk"
+            try:
+                with open(plan_path, "r") as f:
+                    plan = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable launch plan: {e}")
+        if plan and plan.get("format") == LAUNCH_PLAN_FORMAT and not plan["missing_libraries"]:
+            unchanged, restamped = self.check_sources(plan["sources"])
+            if unchanged:
+                if restamped:
+                    self.save_json_cache(plan_path, plan)
+                self.launch_plans[(version, current_os)] = plan
+                TRACER.count(f"launch_plan_{source}_hits")
+                return plan
+        
+        TRACER.count("launch_plan_compiles")
+        version_data, sources = self.resolve_version(version)
+        plan = self.compile_launch_plan(version, version_data, current_os)
+        plan.update(format=LAUNCH_PLAN_FORMAT, sources=sources)
+        self.save_json_cache(plan_path, plan)
+        self.launch_plans[(version, current_os)] = plan
+        return plan
+
+    @staticmethod
+    def save_json_cache(path, data):
+        """Write a derived cache file (merged version JSON, launch plan) next to its version JSON."""
+        try:
+            with open(path, "w") as f:
+                json.dump(data, f)
+        except Exception as e:
+            print(f"⚠️ Failed to save {os.path.basename(path)}: {e}")
+
+    def compile_launch_plan(self, version, version_data, current_os):
+        """Resolve everything about a launch that does not depend on the user: classpath, main class and rule-filtered arguments."""
+        main_class = version_data.get("mainClass", "net.minecraft.client.main.Main")
+        libraries_dir = os.path.join(CTLAUNCHER_DIR, "libraries")
+        jar_id = version_data.get("jar", version)
+        jar_path = os.path.join(VERSIONS_DIR, jar_id, f"{jar_id}.jar")
+        
+        classpath = [jar_path]
+        missing_libraries = 0
+        for lib in version_data.get("libraries", []):
+            if not self.is_library_allowed(lib, current_os):
+                continue  # other OSes' natives are never downloaded here, so they are not missing either
+            artifact = self.library_artifact(lib)
+            if artifact:
+                lib_path = os.path.join(libraries_dir, artifact["path"])
+                if os.path.exists(lib_path):
+                    classpath.append(lib_path)
+                else:
+                    missing_libraries += 1
+        
+        jvm_args = []
+        if "arguments" in version_data and "jvm" in version_data["arguments"]:
+            for arg in version_data["arguments"]["jvm"]:
+                if isinstance(arg, str):
+                    jvm_args.append(arg)
+                elif isinstance(arg, dict) and "rules" in arg and "value" in arg:
+                    if self.evaluate_rules(arg["rules"], current_os):
+                        if isinstance(arg["value"], list):
+                            jvm_args.extend(arg["value"])
+                        else:
+                            jvm_args.append(arg["value"])
+        
+        if current_os == "osx" and "-XstartOnFirstThread" not in jvm_args:
+            jvm_args.append("-XstartOnFirstThread")
+        
+        game_args = []
+        if "arguments" in version_data and "game" in version_data["arguments"]:
+            for arg in version_data["arguments"]["game"]:
+                if isinstance(arg, str):
+                    game_args.append(arg)
+                elif isinstance(arg, dict) and "rules" in arg and "value" in arg:
+                    if self.evaluate_rules(arg["rules"], current_os):
+                        if isinstance(arg["value"], list):
+                            game_args.extend(arg["value"])
+                        else:
+                            game_args.append(arg["value"])
+        elif "minecraftArguments" in version_data:
+            game_args = version_data["minecraftArguments"].split()
+        
+        return {
+            "main_class": main_class,
+            "classpath": classpath,
+            "missing_libraries": missing_libraries,
+            "jvm_args": jvm_args,
+            "needs_library_path": not any("-Djava.library.path=" in arg for arg in jvm_args),
+            "game_args": game_args,
+            "assets_index_name": version_data.get("assetIndex", {}).get("id", "legacy"),
+            "version_type": version_data.get("type", "release"),
+            "java_major": self.get_required_java_major(version_data)
+        }
+
+    @traced("build_launch_command")
+    def build_launch_command(self, version, username, ram, natives_dir, java_bin=None):
+        """Construct the command to launch Minecraft, using the Java runtime the version asks for."""
+        try:
+            plan = self.get_launch_plan(version)
+        except Exception as e:
+            print(f"❌ Failed to read version JSON: {e}")
+            self.show_error("CTLauncher Error", f"Cannot read version {version} JSON.")
+            return []
+        
+        classpath_str = os.pathsep.join(plan["classpath"])
+        libraries_dir = os.path.join(CTLAUNCHER_DIR, "libraries")
+        
+        if not java_bin:
+            java_major = plan["java_major"]
+            java_bin = self.java_runtimes.find(java_major, exact=True)
+            if not java_bin:
+                print(f"❌ No Java {java_major} runtime found")
+                self.show_error("CTLauncher Error", f"Java {java_major} binary not found. Please install Java manually.")
+                return []
+        
+        command = [java_bin, f"-Xmx{ram}G"]
+        
+        jvm_args = list(plan["jvm_args"])
+        if plan["needs_library_path"]:
+            jvm_args.append(f"-Djava.library.path={natives_dir}")
+        
+        uuid = self.generate_offline_uuid(username)
+        values = {
+            "auth_player_name": username,
+            "version_name": version,
+            "game_directory": self.game_dir,
+            "assets_root": ASSETS_DIR,
+            "game_assets": ASSETS_DIR,
+            "assets_index_name": plan["assets_index_name"],
+            "auth_uuid": uuid,
+            "auth_access_token": "0",
+            "auth_session": "0",
+            "auth_xuid": "0",
+            "user_type": "legacy",
+            "version_type": plan["version_type"],
+            "user_properties": "{}",
+            "quickPlayRealms": "",
+            "natives_directory": natives_dir,
+            "library_directory": libraries_dir,
+            "classpath": classpath_str,
+            "classpath_separator": os.pathsep,
+            "launcher_name": "CTLauncher",
+            "launcher_version": "1.0",
+            "clientid": "ctlauncher-offline"  # Dummy client ID for offline
+        }
+        
+        command.extend(substitute_placeholders(jvm_args, values))
+        # Modern versions pass -cp ${classpath} in their JVM arguments; older ones need it added
+        if not any("${classpath}" in arg for arg in jvm_args):
+            command.extend(["-cp", classpath_str])
+        command.append(plan["main_class"])
+        command.extend(substitute_placeholders(plan["game_args"], values))
+        return command
+
+    def validate_username(self, username):
+        """Validate the username to ensure it's non-empty and alphanumeric."""
+        if not username or not re.match(r'^[a-zA-Z0-9_]+$', username):
+            return "Player"
+        return username
+
+    @traced("download_and_launch")
+    def download_and_launch(self, version, username, ram, spawn=True, clicked_at=None):
+        """Handle the download and launch process.
+
+        When the last known good install still matches, the install check is skipped and the
+        version is verified in the background after the JVM starts. clicked_at is the
+        time.monotonic() of the PLAY NOW click, used for the click-to-spawn metric.
+        Returns the launch command once the game was started (or, with spawn=False, once it
+        could have been), otherwise None.
+        """
+        clicked_at = clicked_at or time.monotonic()
+        self.background_verify = None
+        version_url = self.versions.get(version)
+        version_dir = os.path.join(VERSIONS_DIR, version)
+        if not version_url and not os.path.exists(os.path.join(version_dir, f"{version}.json")):
+            self.show_error("CTLauncher Error", f"Version {version} URL not found.")
+            self.set_status("")
+            return None
+        natives_dir = os.path.join(version_dir, "natives")
+        fast_path = not self.deep_verify and self.is_install_current(version)
+        TRACER.current().set("version", version)
+        TRACER.current().set("fast_path", fast_path)
+        if fast_path:
+            print(f"⚡ {version} is unchanged since its last complete install, launching right away")
+        else:
+            self.set_status(f"Downloading {version}...")
+            if not self.download_version_files(version, version_url):
+                self.set_status(f"Failed to download {version}.")
+                return None
+        self.check_cancelled()
+        try:
+            java_major = self.get_required_java_major(self.resolve_version(version)[0])
+        except Exception as e:
+            print(f"⚠️ Could not read the required Java version, assuming {DEFAULT_JAVA_MAJOR}: {e}")
+            java_major = DEFAULT_JAVA_MAJOR
+        self.set_status(f"Checking Java {java_major}...")
+        java_bin = self.install_java_if_needed(java_major)
+        if not java_bin:
+            self.set_status("")
+            return None
+        self.check_cancelled()
+        launch_cmd = self.build_launch_command(version, username, ram, natives_dir, java_bin)  # FIXED: Pass natives_dir
+        if not launch_cmd:
+            self.set_status("")
+            return None
+        self.check_cancelled()
+        if not spawn:
+            return launch_cmd
+        print("🚀 Launching Minecraft with:", " ".join(launch_cmd))
+        print("Have fun gaming!")
+        try:
+            subprocess.Popen(launch_cmd)
+            self.click_to_spawn = time.monotonic() - clicked_at
+            self.record_launch_metric(version, self.click_to_spawn, fast_path)
+            self.set_status(f"Minecraft {version} started.")
+            if fast_path:
+                self.background_verify = self.verify_in_background(version)
+            return launch_cmd
+        except Exception as e:
+            print(f"❌ Failed to launch Minecraft: {e}")
+            self.set_status("Launch failed.")
+            self.show_error("CTLauncher Error", f"Failed to launch Minecraft: {str(e)}.\n\nPlease check your settings or Java installation.")
+            return None
+
+
+class CTLauncher(LauncherCore, tk.Tk if tk else object):
+    def __init__(self):
+        """Initialize the CTLauncher window and UI."""
+        tk.Tk.__init__(self)
+        LauncherCore.__init__(self)
+        self.title("CTLauncher v1.0")
+        self.geometry("900x550")
+        self.minsize(800, 500)
+        self.themes = {'Dark': DARK_THEME, 'Light': LIGHT_THEME}
+        self.current_theme_mode = 'Dark'
+        self.theme = self.themes[self.current_theme_mode]
+        self.configure(bg=self.theme['bg'])
+        self.progress.add_listener(self.on_progress_event)
+        
+        # Configure styles
+        self.style = ttk.Style()
+        self.style.theme_use('clam')
+        self.apply_theme_styles()
+        self.ui_queue = queue.Queue()  # (callback, args) posted by worker threads
+        self.launch_thread = None
+        self.prefetcher = None
+        self.init_ui()
+        self.after(UI_POLL_INTERVAL_MS, self.process_ui_queue)
+
+    def post_to_ui(self, callback, *args):
+        """Schedule callback(*args) on the Tk main thread; safe to call from any thread."""
+        self.ui_queue.put((callback, args))
+
+    def process_ui_queue(self):
+        """Run callbacks posted by worker threads, then poll again with after()."""
+        while True:
+            try:
+                callback, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"⚠️ UI callback failed: {e}")
+        self.after(UI_POLL_INTERVAL_MS, self.process_ui_queue)
+
+    def show_error(self, title, message):
+        """Show an error dialog from any thread."""
+        self.post_to_ui(messagebox.showerror, title, message)
+
+    def show_warning(self, title, message):
+        """Show a warning dialog from any thread."""
+        self.post_to_ui(messagebox.showwarning, title, message)
+
+    def set_status(self, text):
+        """Update the status line under the PLAY button from any thread."""
+        self.post_to_ui(self.status_var.set, text)
+
+    def on_progress_event(self, event):
+        """Progress listener: forward events to the Tk thread."""
+        self.post_to_ui(self.update_progress_ui, event)
+
+    def update_progress_ui(self, event):
+        """Show bytes, throughput, ETA and phase timings in the progress bar and status line."""
+        total, done = event["bytes_total"], event["bytes_done"]
+        self.progress_bar["value"] = min(100.0, 100.0 * done / total) if total else 0
+        if event["type"] == "finished":
+            timings = ", ".join(f"{name} {secs:.1f}s" for name, secs in event["phase_times"].items())
+            self.status_var.set(f"Downloaded {format_bytes(event['bytes_downloaded'])} in "
+                                f"{event['elapsed']:.1f}s ({timings})")
+            return
+        if not event["phases"]:
+            return
+        text = f"{', '.join(event['phases']).capitalize()}: {format_bytes(done)} / {format_bytes(total)}"
+        if event["throughput"]:
+            text += f" • {format_bytes(event['throughput'])}/s"
+        if event["eta"] is not None:
+            minutes, seconds = divmod(int(event["eta"]), 60)
+            text += f" • ETA {minutes}:{seconds:02d}"
+        self.status_var.set(text)
+
+    def apply_theme_styles(self):
+        """Apply theme to ttk styles."""
+        self.style.configure("TFrame", background=self.theme['bg'])
+        self.style.configure("TLabel", background=self.theme['bg'], foreground=self.theme['text'])
+        self.style.configure("TButton",
+                             background=self.theme['button'],
+                             foreground=self.theme['text'],
+                             borderwidth=0,
+                             focuscolor='none')
+        self.style.map("TButton",
+                       background=[('active', self.theme['button_hover']),
+                                   ('pressed', self.theme['accent'])])
+        
+        self.style.configure("TCombobox",
+                             fieldbackground=self.theme['input_bg'],
+                             background=self.theme['input_bg'],
+                             foreground=self.theme['text'],
+                             arrowcolor=self.theme['text'],
+                             borderwidth=0)
+        
+        self.style.configure("Horizontal.TProgressbar",
+                             background=self.theme['accent'],
+                             troughcolor=self.theme['input_bg'],
+                             borderwidth=0)
+        
+        self.style.configure("TScale",
+                             background=self.theme['bg'],
+                             troughcolor=self.theme['input_bg'])
+        
+        self.style.configure("TNotebook",
+                             background=self.theme['header_bg'],
+                             borderwidth=0)
+        self.style.configure("TNotebook.Tab",
+                             background=self.theme['tab_inactive'],
+                             foreground=self.theme['text_secondary'],
+                             padding=[15, 5],
+                             borderwidth=0)
+        self.style.map("TNotebook.Tab",
+                       background=[('selected', self.theme['tab_active'])],
+                       foreground=[('selected', self.theme['text'])])
+
+    def init_ui(self):
+        """Set up the graphical user interface with CTLauncher styling."""
+        # Header
+        self.header = tk.Frame(self, bg=self.theme['header_bg'], height=40)
+        self.header.pack(fill="x", side="top")
+        self.header.pack_propagate(False)
+        
+        # Header title
+        self.title_label = tk.Label(self.header, text="CTLauncher", font=("Arial", 14, "bold"),
+                         bg=self.theme['header_bg'], fg=self.theme['accent'])
+        self.title_label.pack(side="left", padx=15, pady=10)
+        
+        # Header version
         self.version_label = tk.Label(self.header, text="v1.0", font=("Arial", 10),
                            bg=self.theme['header_bg'], fg=self.theme['text_secondary'])
         self.version_label.pack(side="right", padx=15, pady=10)
@@ -221,10 +2961,22 @@ class CTLauncher(tk.Tk):
         skin_button.pack(padx=15, pady=10, fill="x")
         
         # Launch button
-        launch_button = tk.Button(self.left_panel, text="PLAY NOW", font=("Arial", 12, "bold"),
-                                  bg=self.theme['accent'], fg=self.theme['text'],
-                                  bd=0, padx=20, pady=12, command=self.prepare_and_launch)
-        launch_button.pack(side="bottom", padx=15, pady=15, fill="x")
+        self.launch_button = tk.Button(self.left_panel, text="PLAY NOW", font=("Arial", 12, "bold"),
+                                       bg=self.theme['accent'], fg=self.theme['text'],
+                                       bd=0, padx=20, pady=12, command=self.prepare_and_launch)
+        self.launch_button.pack(side="bottom", padx=15, pady=15, fill="x")
+        
+        # Launch status line
+        self.status_var = tk.StringVar(value="")
+        self.status_label = tk.Label(self.left_panel, textvariable=self.status_var, font=("Arial", 9),
+                                     bg=self.theme['sidebar'], fg=self.theme['text_secondary'],
+                                     anchor="w", justify="left", wraplength=270)
+        self.status_label.pack(side="bottom", padx=15, fill="x")
+        
+        # Download progress bar
+        self.progress_bar = ttk.Progressbar(self.left_panel, orient="horizontal", mode="determinate",
+                                            maximum=100, style="Horizontal.TProgressbar")
+        self.progress_bar.pack(side="bottom", padx=15, pady=(0, 5), fill="x")
         
         # Right panel - Tabs and content
         self.right_panel = tk.Frame(self.main_container, bg=self.theme['bg'])
@@ -305,11 +3057,13 @@ class CTLauncher(tk.Tk):
         settings_title.pack(anchor="w", pady=(0, 10))
         
         # Settings options
+        self.deep_verify_var = tk.BooleanVar(value=False)
         settings_options = [
             ("Auto-update CTLauncher", tk.BooleanVar(value=True)),
             ("Close launcher when game starts", tk.BooleanVar(value=False)),
             ("Keep launcher open (recommended)", tk.BooleanVar(value=True)),
-            ("Check for Java updates", tk.BooleanVar(value=True))
+            ("Check for Java updates", tk.BooleanVar(value=True)),
+            ("Deep verify game files on launch (rehash everything)", self.deep_verify_var)
         ]
         for text, var in settings_options:
             cb = tk.Checkbutton(settings_content, text=text, variable=var,
@@ -317,16 +3071,32 @@ class CTLauncher(tk.Tk):
                                 activebackground=self.theme['bg'], activeforeground=self.theme['text'])
             cb.pack(anchor="w", pady=5)
         
+        self.prefetch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(settings_content, text=f"Prefetch new versions in the background ({', '.join(PREFETCH_CATEGORIES)})",
+                       variable=self.prefetch_var, command=self.toggle_prefetch,
+                       bg=self.theme['bg'], fg=self.theme['text'], selectcolor=self.theme['sidebar'],
+                       activebackground=self.theme['bg'], activeforeground=self.theme['text']).pack(anchor="w", pady=5)
+        
         # Game directory setting
         dir_frame = tk.Frame(settings_content, bg=self.theme['bg'])
         dir_frame.pack(fill="x", pady=10)
         
-        tk.Label(dir_frame, text="Game Directory:", bg=self.theme['bg'], fg=self.theme['text']).pack(anchor="w")
+        tk.Label(dir_frame, text="Instance (type a new name to create one):",
+                 bg=self.theme['bg'], fg=self.theme['text']).pack(anchor="w")
+        
+        self.instance_combo = ttk.Combobox(dir_frame, values=self.list_instances(), font=("Arial", 10))
+        self.instance_combo.set(DEFAULT_INSTANCE)
+        self.instance_combo.pack(fill="x", pady=(5, 0))
+        
+        gc_button = tk.Button(settings_content, text="Remove unused stored files", font=("Arial", 10),
+                              bg=self.theme['button'], fg=self.theme['text'],
+                              bd=0, padx=20, pady=8, command=self.collect_blob_garbage)
+        gc_button.pack(anchor="w", pady=10)
         
-        dir_entry = tk.Entry(dir_frame, bg=self.theme['input_bg'], fg=self.theme['text'],
-                             insertbackground=self.theme['text'], bd=0)
-        dir_entry.insert(0, CTLAUNCHER_DIR)
-        dir_entry.pack(fill="x", pady=(5, 0))
+        import_button = tk.Button(settings_content, text="Import offline bundle...", font=("Arial", 10),
+                                  bg=self.theme['button'], fg=self.theme['text'],
+                                  bd=0, padx=20, pady=8, command=self.select_bundle)
+        import_button.pack(anchor="w")
         
         # Load versions after UI is initialized
         self.load_version_manifest()
@@ -388,7 +3158,7 @@ class CTLauncher(tk.Tk):
                         fg = self.theme['accent']
                     widget.configure(bg=bg, fg=fg)
                 elif wtype == tk.Button:
-                    widget.configure(bg=self.theme['button'] if 'PLAY' not in str(widget['text']) else self.theme['accent'], fg=self.theme['text'])
+                    widget.configure(bg=self.theme['button'] if widget is not self.launch_button else self.theme['accent'], fg=self.theme['text'])
                 elif wtype == tk.Entry:
                     widget.configure(bg=self.theme['input_bg'], fg=self.theme['text'], insertbackground=self.theme['text'])
                 elif wtype == tk.Listbox:
@@ -412,242 +3182,38 @@ class CTLauncher(tk.Tk):
         self.ram_frame.configure(bg=self.theme['sidebar'])
         self.ram_header.configure(bg=self.theme['sidebar'])
         self.ram_value_label.configure(bg=self.theme['sidebar'], fg=self.theme['text'])
+        self.status_label.configure(bg=self.theme['sidebar'], fg=self.theme['text_secondary'])
         self.main_container.configure(bg=self.theme['bg'])
         self.right_panel.configure(bg=self.theme['bg'])
 
     def update_version_list(self, event=None):
         """Update the version list based on the selected category."""
-        category = self.category_combo.get()
-        if self.version_categories[category]:
-            self.version_combo['values'] = self.version_categories[category]
-            self.version_combo.current(0)
-        else:
-            self.version_combo['values'] = []
-            self.version_combo.set("")  # Clear selection if category is empty
-            self.category_combo.set("Latest Release")  # Fallback to Latest Release
-            if self.version_categories["Latest Release"]:
-                self.version_combo['values'] = self.version_categories["Latest Release"]
-                self.version_combo.current(0)
-        
-        # Update the listbox in versions tab
-        self.version_listbox.delete(0, tk.END)
-        for version in self.version_categories[category]:
-            self.version_listbox.insert(tk.END, version)
-
-    def download_with_retry(self, url, output_path, description="file", expected_sha1=None):
-        """Download a file with retry logic and checksum verification."""
-        for attempt in range(MAX_RETRIES):
-            try:
-                print(f"📥 Downloading {description} (attempt {attempt + 1}/{MAX_RETRIES})...")
-                
-                # Create SSL context
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
-                
-                req = urllib.request.Request(url, headers={'User-Agent': 'CTLauncher/1.0'})
-                
-                with urllib.request.urlopen(req, context=ssl_context, timeout=DOWNLOAD_TIMEOUT) as response:
-                    with open(output_path, 'wb') as out_file:
-                        out_file.write(response.read())
-                
-                # Verify checksum if provided
-                if expected_sha1 and not self.verify_file(output_path, expected_sha1):
-                    print(f"⚠️ Checksum mismatch for {description}, retrying...")
-                    if os.path.exists(output_path):
-                        os.remove(output_path)
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY * (attempt + 1))
-                        continue
-                    else:
-                        return False
-                
-                print(f"✅ Downloaded {description} successfully!")
-                time.sleep(RATE_LIMIT_DELAY)  # Rate limiting
-                return True
-                
-            except (urllib.error.URLError, ssl.SSLError, ConnectionError, TimeoutError) as e:
-                print(f"⚠️ Network error downloading {description}: {e}")
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                
-                if attempt < MAX_RETRIES - 1:
-                    wait_time = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
-                    print(f"🔄 Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"❌ Failed to download {description} after {MAX_RETRIES} attempts")
-                    return False
-                    
-            except Exception as e:
-                print(f"❌ Unexpected error downloading {description}: {e}")
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                return False
-        
-        return False
-
-    def load_version_manifest(self):
-        """Load the list of available Minecraft versions from Mojang's servers."""
-        try:
-            # Create SSL context that handles certificate verification issues
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            req = urllib.request.Request(
-                VERSION_MANIFEST_URL,
-                headers={
-                    'User-Agent': 'CTLauncher/1.0 (Minecraft Launcher)',
-                    'Accept': 'application/json'
-                }
-            )
-            
-            with urllib.request.urlopen(req, context=ssl_context, timeout=10) as url:
-                manifest = json.loads(url.read().decode())
-                
-                # Clear existing categories
-                for category in self.version_categories:
-                    self.version_categories[category] = []
-                
-                # Categorize versions
-                latest_release = None
-                latest_snapshot = None
-                
-                for v in manifest["versions"]:
-                    self.versions[v["id"]] = v["url"]
-                    
-                    # Track latest versions
-                    if v["id"] == manifest["latest"]["release"]:
-                        latest_release = v["id"]
-                        self.version_categories["Latest Release"].append(v["id"])
-                    elif v["id"] == manifest["latest"]["snapshot"]:
-                        latest_snapshot = v["id"]
-                        self.version_categories["Latest Snapshot"].append(v["id"])
-                    
-                    # Categorize by type
-                    if v["type"] == "release":
-                        if v["id"] != latest_release:
-                            self.version_categories["Release"].append(v["id"])
-                    elif v["type"] == "snapshot":
-                        if v["id"] != latest_snapshot:
-                            self.version_categories["Snapshot"].append(v["id"])
-                    elif v["type"] == "old_beta":
-                        self.version_categories["Old Beta"].append(v["id"])
-                    elif v["type"] == "old_alpha":
-                        self.version_categories["Old Alpha"].append(v["id"])
-                
-                # Update the version combo box
-                self.update_version_list()
-                print("✅ Version manifest loaded successfully!")
-                
-        except urllib.error.URLError as e:
-            print(f"❌ Network error loading version manifest: {e}")
-            messagebox.showerror("CTLauncher Error",
-                                 f"Failed to load version manifest.\n\nNetwork Error: {str(e)}\n\nPlease check your internet connection and firewall settings.")
-        except ssl.SSLError as e:
-            print(f"❌ SSL error loading version manifest: {e}")
-            messagebox.showerror("CTLauncher Error",
-                                 f"SSL verification failed.\n\nError: {str(e)}\n\nPlease check your internet connection.")
-        except Exception as e:
-            print(f"❌ Error loading version manifest: {e}")
-            messagebox.showerror("CTLauncher Error",
-                                 f"Failed to load version manifest.\n\nError: {str(e)}\n\nPlease check your internet connection.")
-
-    def get_latest_java_url(self):
-        """Fetch the latest OpenJDK 21 release URL from Adoptium API."""
-        try:
-            response = requests.get("https://api.adoptium.net/v3/assets/latest/21/hotspot", timeout=10)
-            response.raise_for_status()
-            releases = response.json()
-            system = platform.system()
-            arch = "x64"
-            os_map = {"Windows": "windows", "Linux": "linux", "Darwin": "mac"}
-            os_name = os_map.get(system, None)
-            if not os_name:
-                return None, None
-            for release in releases:
-                if release["binary"]["os"] == os_name and release["binary"]["architecture"] == arch:
-                    return release["binary"]["package"]["link"], release["version"]["openjdk_version"]
-            return None, None
-        except Exception as e:
-            print(f"❌ Failed to fetch latest Java version: {e}")
-            return None, None
-
-    def is_java_installed(self, required_version="21"):
-        """Check if a compatible Java version (21 or higher) is installed."""
-        try:
-            # First check system Java
-            result = subprocess.run(["java", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            output = result.stderr
-            match = re.search(r'version "(\d+)', output)
-            if match:
-                major_version = int(match.group(1))
-                return major_version >= int(required_version)
-        except Exception:
-            pass
+        category = self.category_combo.get()
+        if self.version_categories[category]:
+            self.version_combo['values'] = self.version_categories[category]
+            self.version_combo.current(0)
+        else:
+            self.version_combo['values'] = []
+            self.version_combo.set("")  # Clear selection if category is empty
+            self.category_combo.set("Latest Release")  # Fallback to Latest Release
+            if self.version_categories["Latest Release"]:
+                self.version_combo['values'] = self.version_categories["Latest Release"]
+                self.version_combo.current(0)
         
-        # Check local Java installation
-        try:
-            java_bin = os.path.join(JAVA_DIR, self.get_local_java_dir(), "bin", "java.exe" if platform.system() == "Windows" else "java")
-            if os.path.exists(java_bin):
-                result = subprocess.run([java_bin, "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                output = result.stderr
-                match = re.search(r'version "(\d+)', output)
-                if match:
-                    major_version = int(match.group(1))
-                    return major_version >= int(required_version)
-            return False
-        except Exception:
-            return False
+        # Update the listbox in versions tab
+        self.version_listbox.delete(0, tk.END)
+        for version in self.version_categories[category]:
+            self.version_listbox.insert(tk.END, version)
 
-    def get_local_java_dir(self):
-        """Find the extracted Java directory dynamically."""
-        if not os.path.exists(JAVA_DIR):
-            return "jdk-21.0.5+11"
-        for dir_name in os.listdir(JAVA_DIR):
-            if dir_name.startswith("jdk-") and os.path.isdir(os.path.join(JAVA_DIR, dir_name)):
-                return dir_name
-        return "jdk-21.0.5+11"  # Fallback to default if not found
-
-    def install_java_if_needed(self):
-        """Install the latest OpenJDK 21 if a compatible Java version is not found."""
-        if self.is_java_installed():
-            print("✅ Java is already installed!")
-            return
-        print("Installing OpenJDK 21...")
-        java_url, java_version = self.get_latest_java_url()
-        if not java_url:
-            messagebox.showerror("CTLauncher Error", "Unsupported OS or failed to fetch Java URL!")
-            return
-        archive_ext = "zip" if platform.system() == "Windows" else "tar.gz"
-        archive_path = os.path.join(JAVA_DIR, f"openjdk.{archive_ext}")
-        os.makedirs(JAVA_DIR, exist_ok=True)
-        # Use download_with_retry for Java installation
-        if not self.download_with_retry(java_url, archive_path, "Java 21"):
-            messagebox.showerror("CTLauncher Error",
-                                 "Failed to download Java 21. Please check your internet connection or install Java manually.")
-            return
-        try:
-            if platform.system() == "Windows":
-                with zipfile.ZipFile(archive_path, "r") as zip_ref:
-                    zip_ref.extractall(JAVA_DIR)
-            else:
-                import tarfile
-                with tarfile.open(archive_path, "r:gz") as tar_ref:
-                    tar_ref.extractall(JAVA_DIR)
-                java_bin = os.path.join(JAVA_DIR, self.get_local_java_dir(), "bin", "java")
-                if os.path.exists(java_bin):
-                    os.chmod(java_bin, 0o755)  # Make Java executable
-        except Exception as e:
-            print(f"❌ Failed to extract Java: {e}")
-            messagebox.showerror("CTLauncher Error",
-                                 f"Failed to extract Java 21: {str(e)}.\n\nPlease try again or install Java manually.")
-            return
-        finally:
-            if os.path.exists(archive_path):
-                os.remove(archive_path)  # Cleanup archive
-        print("✅ Java 21 installed locally!")
+    def apply_version_manifest(self, manifest):
+        """Sort the manifest's versions into categories and refresh the version widgets."""
+        super().apply_version_manifest(manifest)
+        
+        # Update the version combo box, keeping the user's pick if a refresh still lists it
+        selected = self.version_combo.get()
+        self.update_version_list()
+        if selected and selected in self.version_combo['values']:
+            self.version_combo.set(selected)
 
     def select_skin(self):
         """Allow the user to select and apply a custom skin PNG file."""
@@ -662,376 +3228,295 @@ class CTLauncher(tk.Tk):
                 print(f"❌ Failed to apply skin: {e}")
                 messagebox.showerror("CTLauncher Error", f"Failed to apply skin: {str(e)}.\n\nPlease check file permissions or try another file.")
 
-    @staticmethod
-    def verify_file(file_path, expected_sha1):
-        """Verify the SHA1 checksum of a file."""
-        try:
-            with open(file_path, "rb") as f:
-                file_hash = hashlib.sha1(f.read()).hexdigest()
-            return file_hash == expected_sha1
-        except Exception as e:
-            print(f"❌ Failed to verify file {file_path}: {e}")
-            return False
-
-    def download_assets(self, version_data):
-        """Download asset index and missing asset objects."""
-        try:
-            asset_index = version_data.get("assetIndex", {})
-            if not asset_index:
-                print("⚠️ No asset index found, skipping assets.")
-                return True
-
-            index_url = asset_index["url"]
-            index_hash = asset_index["sha1"]
-            index_path = os.path.join(ASSETS_DIR, "indexes", f"{asset_index['id']}.json")
-            os.makedirs(os.path.dirname(index_path), exist_ok=True)
-
-            if not os.path.exists(index_path) or not self.verify_file(index_path, index_hash):
-                if not self.download_with_retry(index_url, index_path, "asset index", index_hash):
-                    return False
-
-            with open(index_path, "r") as f:
-                assets = json.load(f)
-
-            objects_dir = os.path.join(ASSETS_DIR, "objects")
-            os.makedirs(objects_dir, exist_ok=True)
-
-            total_objects = len(assets["objects"])
-            downloaded = 0
-            for obj_name, obj_info in assets["objects"].items():
-                obj_hash = obj_info["hash"]
-                obj_path = os.path.join(objects_dir, obj_hash[:2], obj_hash)
-                os.makedirs(os.path.dirname(obj_path), exist_ok=True)
-
-                if not os.path.exists(obj_path) or not self.verify_file(obj_path, obj_hash):
-                    obj_url = f"https://resources.download.minecraft.net/{obj_hash[:2]}/{obj_hash}"
-                    if not self.download_with_retry(obj_url, obj_path, f"asset {obj_name}", obj_hash):
-                        print(f"⚠️ Failed to download asset {obj_name}, continuing...")
-                        continue
-                    downloaded += 1
-                    print(f"📥 Assets: {downloaded}/{total_objects} downloaded")
-
-            print(f"✅ Assets downloaded: {downloaded}/{total_objects}")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to download assets: {e}")
-            return False
+    def toggle_prefetch(self):
+        """Settings checkbox: start or stop the background prefetcher."""
+        if self.prefetch_var.get():
+            if not self.prefetcher:
+                self.prefetcher = PrefetchDaemon(self)
+                self.prefetcher.start()
+        elif self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
 
-    def download_version_files(self, version_id, version_url):
-        """Download the version JSON, JAR, libraries, natives, and assets with checksum verification."""
-        print(f"⬇️ Downloading version files for {version_id}...")
-        version_dir = os.path.join(VERSIONS_DIR, version_id)
-        os.makedirs(version_dir, exist_ok=True)
-        
-        # Download version JSON
-        version_json_path = os.path.join(version_dir, f"{version_id}.json")
-        if not self.download_with_retry(version_url, version_json_path, f"{version_id} JSON"):
-            messagebox.showerror("CTLauncher Error", f"Failed to download version {version_id} JSON.")
-            return False
-        
-        try:
-            with open(version_json_path, "r") as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"❌ Failed to read version JSON: {e}")
-            messagebox.showerror("CTLauncher Error", f"Cannot read version {version_id} JSON.")
-            return False
-        
-        # Download assets
-        if not self.download_assets(data):
-            messagebox.showwarning("CTLauncher Warning", "Failed to download some assets. Game may have missing textures/sounds.")
-        
-        # Download client JAR
-        try:
-            jar_url = data["downloads"]["client"]["url"]
-            jar_path = os.path.join(version_dir, f"{version_id}.jar")
-            expected_sha1 = data["downloads"]["client"]["sha1"]
-            
-            if not os.path.exists(jar_path) or not CTLauncher.verify_file(jar_path, expected_sha1):
-                if not self.download_with_retry(jar_url, jar_path, f"{version_id} JAR", expected_sha1):
-                    messagebox.showerror("CTLauncher Error", f"Failed to download version {version_id} JAR.")
-                    return False
-        except KeyError as e:
-            print(f"❌ Missing client JAR info in JSON: {e}")
-            messagebox.showerror("CTLauncher Error", f"Version {version_id} is missing client JAR information.")
-            return False
-        
-        current_os = platform.system().lower()
-        if current_os == "darwin":
-            current_os = "osx"
-        
-        libraries_dir = os.path.join(CTLAUNCHER_DIR, "libraries")
-        os.makedirs(libraries_dir, exist_ok=True)
-        
-        natives_dir = os.path.join(version_dir, "natives")
-        os.makedirs(natives_dir, exist_ok=True)
+    def select_bundle(self):
+        """Settings button: import an offline bundle on a worker thread."""
+        bundle_path = filedialog.askopenfilename(filetypes=[("CTLauncher bundles", "*.zip"), ("All files", "*.*")])
+        if not bundle_path:
+            return
         
-        # Download libraries with improved error handling
-        for lib in data.get("libraries", []):
-            if self.is_library_allowed(lib, current_os):
-                # Download artifact
-                if "downloads" in lib and "artifact" in lib["downloads"]:
-                    lib_url = lib["downloads"]["artifact"]["url"]
-                    lib_path = os.path.join(libraries_dir, lib["downloads"]["artifact"]["path"])
-                    os.makedirs(os.path.dirname(lib_path), exist_ok=True)
-                    expected_sha1 = lib["downloads"]["artifact"]["sha1"]
-                    
-                    if not os.path.exists(lib_path) or not CTLauncher.verify_file(lib_path, expected_sha1):
-                        lib_name = lib.get('name', 'unknown')
-                        if not self.download_with_retry(lib_url, lib_path, f"library {lib_name}", expected_sha1):
-                            print(f"⚠️ Warning: Failed to download library {lib_name}, continuing...")
-                            continue
-                
-                # Download natives
-                if "natives" in lib and current_os in lib["natives"]:
-                    classifier = lib["natives"][current_os]
-                    if "downloads" in lib and "classifiers" in lib["downloads"] and classifier in lib["downloads"]["classifiers"]:
-                        native_url = lib["downloads"]["classifiers"][classifier]["url"]
-                        native_path = os.path.join(natives_dir, f"{classifier}.jar")
-                        expected_sha1 = lib["downloads"]["classifiers"][classifier]["sha1"]
-                        
-                        if not os.path.exists(native_path) or not CTLauncher.verify_file(native_path, expected_sha1):
-                            lib_name = lib.get('name', 'unknown')
-                            if not self.download_with_retry(native_url, native_path, f"native {lib_name}", expected_sha1):
-                                print(f"⚠️ Warning: Failed to download native {lib_name}, continuing...")
-                                continue
-                        
-                        # Extract natives
-                        try:
-                            with zipfile.ZipFile(native_path, "r") as zip_ref:
-                                zip_ref.extractall(natives_dir)
-                            os.remove(native_path)
-                        except Exception as e:
-                            print(f"⚠️ Warning: Failed to extract native {lib.get('name', 'unknown')}: {e}")
+        def run_import():
+            try:
+                written, present = self.import_bundle(bundle_path)
+                self.set_status(f"Imported {written} files ({present} already present).")
+            except Exception as e:
+                print(f"❌ Bundle import failed: {e}")
+                self.show_error("CTLauncher Error", f"Failed to import bundle: {str(e)}")
         
-        print("✅ Download complete! Ready to play!")
-        return True
-
-    def create_game_directories(self):
-        """Create all necessary game directories and initialize logs."""
-        os.makedirs(os.path.join(CTLAUNCHER_DIR, "logs"), exist_ok=True)
-        os.makedirs(os.path.join(CTLAUNCHER_DIR, "crash-reports"), exist_ok=True)
-        os.makedirs(ASSETS_DIR, exist_ok=True)
-        os.makedirs(os.path.join(ASSETS_DIR, "indexes"), exist_ok=True)
-        os.makedirs(os.path.join(ASSETS_DIR, "objects"), exist_ok=True)
-        os.makedirs(os.path.join(CTLAUNCHER_DIR, "saves"), exist_ok=True)
-        os.makedirs(os.path.join(CTLAUNCHER_DIR, "resourcepacks"), exist_ok=True)
-        os.makedirs(os.path.join(CTLAUNCHER_DIR, "skins"), exist_ok=True)
-
-        # Initialize logs/latest.log to avoid access denied
-        log_path = os.path.join(CTLAUNCHER_DIR, "logs", "latest.log")
-        if not os.path.exists(log_path):
-            with open(log_path, "w") as f:
-                f.write("")  # Empty file
-        print("📁 Game directories and logs initialized.")
+        self.set_status("Importing offline bundle...")
+        threading.Thread(target=run_import, daemon=True).start()
 
-    def modify_options_txt(self, target_fps=60):
-        """Modify options.txt to set maxFps and disable vsync, preserving other settings."""
-        options_path = os.path.join(CTLAUNCHER_DIR, "options.txt")
-        options = {}
-        if os.path.exists(options_path):
+    def collect_blob_garbage(self):
+        """Settings button: delete stored blobs that no version or instance links to."""
+        def run_gc():
             try:
-                with open(options_path, "r") as f:
-                    for line in f:
-                        parts = line.strip().split(":", 1)
-                        if len(parts) == 2:
-                            options[parts[0]] = parts[1]
+                removed, freed = self.blobs.collect_garbage()
             except Exception as e:
-                print(f"⚠️ Could not read options.txt: {e}")
-        
-        options['maxFps'] = str(target_fps)
-        options['enableVsync'] = 'false'
+                print(f"❌ Cleaning the blob store failed: {e}")
+                self.show_error("CTLauncher Error", f"Failed to clean the blob store: {str(e)}")
+                return
+            print(f"🧹 Removed {removed} unused stored files ({format_bytes(freed)})")
+            self.set_status(f"Removed {removed} unused stored files.")
+            self.post_to_ui(messagebox.showinfo, "CTLauncher",
+                            f"Removed {removed} unused stored files, freeing {format_bytes(freed)}.")
         
+        self.set_status("Cleaning up stored files...")
+        threading.Thread(target=run_gc, daemon=True).start()
+
+    def prepare_and_launch(self):
+        """PLAY NOW handler: start the launch pipeline on a worker thread, or cancel the running one."""
+        if self.launch_thread and self.launch_thread.is_alive():
+            self.cancel_event.set()
+            self.launch_button.config(text="CANCELLING...")
+            self.status_var.set("Cancelling...")
+            return
+        version = self.version_combo.get()
+        if not version:
+            messagebox.showerror("CTLauncher Error", "No version selected.")
+            return
+        username = self.validate_username(self.username_input.get())
+        ram = int(self.ram_scale.get())
+        self.deep_verify = self.deep_verify_var.get()
+        self.game_dir = self.instance_game_dir(self.instance_combo.get().strip())
+        self.cancel_event.clear()
+        self.launch_button.config(text="CANCEL")
+        self.launch_thread = threading.Thread(target=self.run_launch_pipeline,
+                                              args=(version, username, ram, time.monotonic()), daemon=True)
+        self.launch_thread.start()
+
+    def run_launch_pipeline(self, version, username, ram, clicked_at=None):
+        """Set up directories, Java and game files, then launch (runs on a worker thread)."""
+        self.progress.reset()
+        self.post_to_ui(self.progress_bar.config, {"value": 0})
+        event_log = None
         try:
-            os.makedirs(os.path.dirname(options_path), exist_ok=True)
-            with open(options_path, "w") as f:
-                for key, value in options.items():
-                    f.write(f"{key}:{value}\n")
-            print(f"⚙️ Set maxFps to {target_fps} and disabled vsync!")
+            self.set_status("Preparing game directories...")
+            self.create_game_directories()  # FIXED: Create dirs and init logs
+            self.check_cancelled()
+            self.modify_options_txt(target_fps=60)
+            event_log = ProgressEventLog(PROGRESS_LOG_PATH)
+            self.progress.add_listener(event_log)
+            self.download_and_launch(version, username, ram, clicked_at=clicked_at)
+        except TaskCancelled:
+            print("🛑 Launch cancelled.")
+            self.set_status("Launch cancelled.")
         except Exception as e:
-            print(f"❌ Failed to write options.txt: {e}")
+            print(f"❌ Launch failed: {e}")
+            self.set_status("Launch failed.")
+            self.show_error("CTLauncher Error", f"Launch failed: {str(e)}")
+        finally:
+            if event_log:
+                self.progress.remove_listener(event_log)
+                event_log.close()
+            self.post_to_ui(self.launch_button.config, {"text": "PLAY NOW"})
 
-    def is_library_allowed(self, lib, current_os):
-        """Check if a library is allowed on the current OS based on its rules."""
-        if "rules" not in lib:
-            return True
-        allowed = False
-        for rule in lib["rules"]:
-            if rule["action"] == "allow":
-                if "os" not in rule or (isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os):
-                    allowed = True
-            elif rule["action"] == "disallow":
-                if "os" in rule and isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os:
-                    allowed = False
-        return allowed
 
-    def evaluate_rules(self, rules, current_os):
-        """Evaluate argument rules based on the current OS, ignoring feature-based rules."""
-        if not rules:
-            return True
-        allowed = False
-        for rule in rules:
-            if "features" in rule:
-                continue
-            if rule["action"] == "allow":
-                if "os" not in rule or (isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os):
-                    allowed = True
-            elif rule["action"] == "disallow":
-                if "os" in rule and isinstance(rule.get("os"), dict) and rule["os"].get("name") == current_os:
-                    allowed = False
-        return allowed
+def installed_versions():
+    """Return the IDs of versions with a JSON under VERSIONS_DIR."""
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    return [v for v in sorted(os.listdir(VERSIONS_DIR)) if os.path.exists(os.path.join(VERSIONS_DIR, v, f"{v}.json"))]
 
-    def generate_offline_uuid(self, username):
-        """Generate a UUID for offline mode based on the username."""
-        offline_prefix = "OfflinePlayer:"
-        hash_value = hashlib.md5((offline_prefix + username).encode('utf-8')).hexdigest()
-        uuid_str = f"{hash_value[:8]}-{hash_value[8:12]}-{hash_value[12:16]}-{hash_value[16:20]}-{hash_value[20:32]}"
-        return uuid_str
 
-    def build_launch_command(self, version, username, ram, natives_dir):
-        """Construct the command to launch Minecraft."""
-        version_dir = os.path.join(VERSIONS_DIR, version)
-        json_path = os.path.join(version_dir, f"{version}.json")
+def cli_install(core, versions, jobs=2, deep_verify=False, install_java=True, rate_limiter=None):
+    """Install several versions at once, each on its own worker sharing core's caches."""
+    def install_one(version):
+        worker = LauncherCore(shared=core)
+        worker.deep_verify = deep_verify
+        worker.rate_limiter = rate_limiter
+        started = time.monotonic()
+        result = {"version": version, "ok": False}
         try:
-            with open(json_path, "r") as f:
-                version_data = json.load(f)
+            version_url = core.versions.get(version)
+            if not version_url and not os.path.exists(os.path.join(VERSIONS_DIR, version, f"{version}.json")):
+                worker.show_error("CTLauncher Error", f"Version {version} not found in the manifest.")
+            elif worker.download_version_files(version, version_url):
+                result["ok"] = True
+                if install_java:
+                    java_major = worker.get_required_java_major(worker.resolve_version(version)[0])
+                    result["java"] = worker.install_java_if_needed(java_major)
+                    result["ok"] = bool(result["java"])
+        except TaskCancelled:
+            worker.errors.append("cancelled")
         except Exception as e:
-            print(f"❌ Failed to read version JSON: {e}")
-            messagebox.showerror("CTLauncher Error", f"Cannot read version {version} JSON.")
-            return []
-        
-        current_os = platform.system().lower()
-        if current_os == "darwin":
-            current_os = "osx"
-        
-        main_class = version_data.get("mainClass", "net.minecraft.client.main.Main")
-        libraries_dir = os.path.join(CTLAUNCHER_DIR, "libraries")
-        jar_path = os.path.join(version_dir, f"{version}.jar")
-        
-        classpath = [jar_path]
-        for lib in version_data.get("libraries", []):
-            if "downloads" in lib and "artifact" in lib["downloads"]:
-                lib_path = os.path.join(libraries_dir, lib["downloads"]["artifact"]["path"])
-                if os.path.exists(lib_path):
-                    classpath.append(lib_path)
-        
-        classpath_str = ";".join(classpath) if platform.system() == "Windows" else ":".join(classpath)
-        
-        java_bin = "java"
-        if not self.is_java_installed():
-            java_bin = os.path.join(JAVA_DIR, self.get_local_java_dir(), "bin", "java.exe" if platform.system() == "Windows" else "java")
-            if not os.path.exists(java_bin):
-                print(f"❌ Java binary not found at {java_bin}")
-                messagebox.showerror("CTLauncher Error", "Java binary not found. Please install Java manually.")
-                return []
-        
-        command = [java_bin, f"-Xmx{ram}G"]
-        
-        jvm_args = []
-        if "arguments" in version_data and "jvm" in version_data["arguments"]:
-            for arg in version_data["arguments"]["jvm"]:
-                if isinstance(arg, str):
-                    jvm_args.append(arg)
-                elif isinstance(arg, dict) and "rules" in arg and "value" in arg:
-                    if self.evaluate_rules(arg["rules"], current_os):
-                        if isinstance(arg["value"], list):
-                            jvm_args.extend(arg["value"])
-                        else:
-                            jvm_args.append(arg["value"])
-        
-        if platform.system() == "Darwin" and "-XstartOnFirstThread" not in jvm_args:
-            jvm_args.append("-XstartOnFirstThread")
-        
-        if not any("-Djava.library.path=" in arg for arg in jvm_args):
-            jvm_args.append(f"-Djava.library.path={natives_dir}")
-        
-        command.extend(jvm_args)
-        
-        game_args = []
-        if "arguments" in version_data and "game" in version_data["arguments"]:
-            for arg in version_data["arguments"]["game"]:
-                if isinstance(arg, str):
-                    game_args.append(arg)
-                elif isinstance(arg, dict) and "rules" in arg and "value" in arg:
-                    if self.evaluate_rules(arg["rules"], current_os):
-                        if isinstance(arg["value"], list):
-                            game_args.extend(arg["value"])
-                        else:
-                            game_args.append(arg["value"])
-        elif "minecraftArguments" in version_data:
-            game_args = version_data["minecraftArguments"].split()
-        
-        uuid = self.generate_offline_uuid(username)
-        replacements = {
-            "${auth_player_name}": username,
-            "${version_name}": version,
-            "${game_directory}": CTLAUNCHER_DIR,
-            "${assets_root}": ASSETS_DIR,
-            "${assets_index_name}": version_data.get("assetIndex", {}).get("id", "legacy"),
-            "${auth_uuid}": uuid,
-            "${auth_access_token}": "0",
-            "${user_type}": "legacy",
-            "${version_type}": version_data.get("type", "release"),
-            "${user_properties}": "{}",
-            "${quickPlayRealms}": "",
-            "${natives_directory}": natives_dir,  # FIXED: Add natives_directory replacement
-            "${launcher_name}": "CTLauncher",  # FIXED: Resolve launcher placeholders
-            "${launcher_version}": "1.0",
-            "${clientid}": "ctlauncher-offline"  # FIXED: Dummy client ID for offline
-        }
-        
-        def replace_placeholders(arg):
-            for key, value in replacements.items():
-                arg = arg.replace(key, value)
-            return arg
-        
-        game_args = [replace_placeholders(arg) for arg in game_args]
-        jvm_args = [replace_placeholders(arg) for arg in jvm_args]
-        
-        command.extend(["-cp", classpath_str, main_class] + game_args)
-        return command
+            worker.show_error("CTLauncher Error", f"Install of {version} failed: {e}")
+        result.update(seconds=round(time.monotonic() - started, 3),
+                      bytes_downloaded=worker.progress.bytes_downloaded, errors=worker.errors)
+        return result
+    
+    with ThreadPoolExecutor(max_workers=max(1, jobs), initializer=TRACER.adopt,
+                            initargs=(TRACER.current(),)) as executor:
+        try:
+            return list(executor.map(install_one, versions))
+        except KeyboardInterrupt:
+            core.cancel_event.set()  # Let the running installs stop before the executor joins them
+            raise
 
-    def validate_username(self, username):
-        """Validate the username to ensure it's non-empty and alphanumeric."""
-        if not username or not re.match(r'^[a-zA-Z0-9_]+$', username):
-            return "Player"
-        return username
 
-    def prepare_and_launch(self):
-        """Wrapper function to handle setup before launching."""
-        self.create_game_directories()  # FIXED: Create dirs and init logs
-        self.install_java_if_needed()
-        self.modify_options_txt(target_fps=60)
-        self.download_and_launch()
-
-    def download_and_launch(self):
-        """Handle the download and launch process."""
-        version = self.version_combo.get()
-        if not version:
-            messagebox.showerror("CTLauncher Error", "No version selected.")
-            return
-        username = self.validate_username(self.username_input.get())
-        ram = int(self.ram_scale.get())
-        version_url = self.versions.get(version)
-        if not version_url:
-            messagebox.showerror("CTLauncher Error", f"Version {version} URL not found.")
-            return
-        version_dir = os.path.join(VERSIONS_DIR, version)
-        natives_dir = os.path.join(version_dir, "natives")
-        if not self.download_version_files(version, version_url):
-            return
-        launch_cmd = self.build_launch_command(version, username, ram, natives_dir)  # FIXED: Pass natives_dir
-        if not launch_cmd:
-            return
-        print("🚀 Launching Minecraft with:", " ".join(launch_cmd))
-        print("Have fun gaming!")
+def run_cli(argv):
+    """Headless entry point: install, verify, launch, prefetch and gc without Tk. Returns the exit code."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", help="print one JSON result on stdout, logs go to stderr")
+    common.add_argument("--mirror", help="fetch everything from this mirror base URL (<mirror>/<host>/<path>)")
+    common.add_argument("--trace", choices=("jsonl", "chrome"), default=TRACE_FORMAT or None,
+                        help="write timing spans to ~/.ctlauncher/logs (also CTLAUNCHER_TRACE)")
+    common.add_argument("--profile", action="store_true", default=TRACE_PROFILE,
+                        help="dump a cProfile of the command next to the trace (also CTLAUNCHER_PROFILE=1)")
+    parser = argparse.ArgumentParser(prog="ctlauncher", description="CTLauncher command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+    install = commands.add_parser("install", parents=[common], help="download versions and their Java runtime")
+    install.add_argument("versions", nargs="+")
+    install.add_argument("--jobs", type=int, default=2, help="versions installed concurrently")
+    install.add_argument("--deep-verify", action="store_true", help="rehash every file instead of trusting the index")
+    install.add_argument("--no-java", action="store_true", help="skip installing the Java runtime")
+    verify = commands.add_parser("verify", parents=[common], help="check installed files against their SHA1")
+    verify.add_argument("versions", nargs="*", help="defaults to every installed version")
+    verify.add_argument("--deep", action="store_true", help="rehash every file instead of trusting the index")
+    verify.add_argument("--repair", action="store_true", help="download the missing or corrupt files again")
+    launch = commands.add_parser("launch", parents=[common], help="install if needed and start the game")
+    launch.add_argument("version")
+    launch.add_argument("--username", default="Player")
+    launch.add_argument("--ram", type=int, default=4, help="maximum heap in GB")
+    launch.add_argument("--instance", default=DEFAULT_INSTANCE)
+    launch.add_argument("--dry-run", action="store_true", help="print the command instead of starting the game")
+    prefetch = commands.add_parser("prefetch", parents=[common], help="download game files without Java")
+    prefetch.add_argument("versions", nargs="*")
+    prefetch.add_argument("--all-releases", action="store_true", help="every release in the version manifest")
+    prefetch.add_argument("--jobs", type=int, default=2, help="versions downloaded concurrently")
+    prefetch.add_argument("--category", action="append", dest="categories",
+                          help=f"keep a version category warm, e.g. \"Latest Snapshot\" (default: {PREFETCH_CATEGORIES})")
+    prefetch.add_argument("--daemon", action="store_true", help="keep running and recheck the manifest periodically")
+    prefetch.add_argument("--interval", type=int, default=PREFETCH_INTERVAL, help="seconds between daemon passes")
+    prefetch.add_argument("--limit-rate", type=int, default=0, help="bandwidth cap in KB/s (0 for unlimited)")
+    prefetch.add_argument("--workers", type=int, default=PREFETCH_MAX_WORKERS,
+                          help="download threads for --category/--daemon prefetching")
+    export = commands.add_parser("export", parents=[common], help="write installed versions into an offline bundle")
+    export.add_argument("versions", nargs="+")
+    export.add_argument("--output", required=True, help="bundle file to write")
+    export.add_argument("--no-java", action="store_true", help="leave the Java runtime out of the bundle")
+    bundle_import = commands.add_parser("import", parents=[common], help="install everything from an offline bundle")
+    bundle_import.add_argument("bundle")
+    commands.add_parser("gc", parents=[common], help="remove stored files nothing links to")
+    commands.add_parser("bench-placeholders", parents=[common], help="time launch placeholder substitution")
+    args = parser.parse_args(argv)
+    if args.mirror:
+        global MIRROR_BASE_URL
+        MIRROR_BASE_URL = args.mirror
+    TRACER.configure(args.trace or "", args.profile)
+    
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout), contextlib.closing(TRACER), \
+            TRACER.span(f"cli {args.command}"):
+        core = LauncherCore()
         try:
-            subprocess.Popen(launch_cmd)
-        except Exception as e:
-            print(f"❌ Failed to launch Minecraft: {e}")
-            messagebox.showerror("CTLauncher Error", f"Failed to launch Minecraft: {str(e)}.\n\nPlease check your settings or Java installation.")
+            if args.command in ("install", "launch", "prefetch", "export"):
+                core.load_version_manifest(background=False)
+            if args.command == "install":
+                results = cli_install(core, args.versions, args.jobs, args.deep_verify, not args.no_java)
+                result, ok = {"installs": results}, all(r["ok"] for r in results)
+            elif args.command == "prefetch" and (args.daemon or args.categories):
+                prefetcher = PrefetchDaemon(core, args.categories, args.interval, args.limit_rate * 1024, args.workers)
+                if args.daemon:
+                    prefetcher.worker.cancel_event = core.cancel_event  # Ctrl-C stops the daemon
+                    prefetcher.run()
+                    result, ok = {}, True
+                else:
+                    results = prefetcher.run_once()
+                    result, ok = {"prefetched": results}, all(r["ok"] for r in results)
+            elif args.command == "prefetch":
+                versions = list(args.versions)
+                if args.all_releases:
+                    versions += [v for v in core.version_categories["Latest Release"] + core.version_categories["Release"]
+                                 if v not in versions]
+                rate_limiter = BandwidthLimiter(args.limit_rate * 1024) if args.limit_rate else None
+                results = cli_install(core, versions, args.jobs, install_java=False, rate_limiter=rate_limiter)
+                result, ok = {"installs": results}, all(r["ok"] for r in results)
+            elif args.command == "verify":
+                core.deep_verify = args.deep
+                result, ok = {"versions": []}, True
+                for version in args.versions or installed_versions():
+                    repaired = 0
+                    try:
+                        jobs = core.verify_version(version)
+                        if jobs and args.repair:
+                            unfixable = [job for job in jobs if not job.get("url")]
+                            left = core.download_many([job for job in jobs if job.get("url")]) + unfixable
+                            repaired, jobs = len(jobs) - len(left), left
+                        failures = [job["path"] for job in jobs]
+                    except Exception as e:
+                        core.errors.append(f"{version}: {e}")
+                        failures, ok = [], False
+                    result["versions"].append({"version": version, "ok": not failures, "failures": failures,
+                                               "repaired": repaired})
+                    ok = ok and not failures
+                result["errors"] = core.errors
+            elif args.command == "launch":
+                core.game_dir = core.instance_game_dir(args.instance)
+                core.create_game_directories()
+                clicked_at = time.monotonic()
+                command = core.download_and_launch(args.version, core.validate_username(args.username), args.ram,
+                                                   spawn=not args.dry_run, clicked_at=clicked_at)
+                result, ok = {"version": args.version, "command": command, "errors": core.errors}, command is not None
+                if ok and not args.dry_run:
+                    result["click_to_spawn"] = round(core.click_to_spawn, 4)
+                if core.background_verify:
+                    core.background_verify.join()  # The game is already running; finish the check before exiting
+            elif args.command == "export":
+                try:
+                    count = core.export_bundle(args.versions, args.output, include_java=not args.no_java)
+                    result, ok = {"bundle": args.output, "files": count}, True
+                except ValueError as e:
+                    core.show_error("CTLauncher Error", str(e))
+                    result, ok = {"bundle": args.output, "errors": core.errors}, False
+            elif args.command == "import":
+                written, present = core.import_bundle(args.bundle)
+                result, ok = {"bundle": args.bundle, "written": written, "already_present": present}, True
+            elif args.command == "gc":
+                removed, freed = core.blobs.collect_garbage()
+                print(f"🧹 Removed {removed} unused stored files ({format_bytes(freed)})")
+                result, ok = {"removed": removed, "bytes_freed": freed}, True
+            else:
+                try:
+                    timings = benchmark_placeholders()
+                    result, ok = {"seconds_per_round": timings}, True
+                except ValueError as e:
+                    print(f"❌ {e}")
+                    result, ok = {"errors": [str(e)]}, False
+        except KeyboardInterrupt:
+            core.cancel_event.set()
+            result, ok = {"errors": ["cancelled"]}, False
+    
+    if args.json:
+        result["ok"] = ok
+        out.write(json.dumps(result) + "\n")
+    elif "installs" in result:
+        for r in result["installs"]:
+            print(f"{'✅' if r['ok'] else '❌'} {r['version']} in {r['seconds']:.1f}s "
+                  f"({format_bytes(r['bytes_downloaded'])} downloaded)")
+    elif args.command == "verify":
+        for v in result["versions"]:
+            repaired = f", {v['repaired']} repaired" if v.get("repaired") else ""
+            print(f"{'✅' if v['ok'] else '❌'} {v['version']}: {len(v['failures'])} missing or corrupt files{repaired}")
+    elif args.command == "launch" and args.dry_run and ok:
+        print(" ".join(result["command"]))
+    return 0 if ok else 1
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    if tk is None:
+        print("❌ Tkinter is not installed, so the launcher window cannot open. Run with --help for the command line.")
+        sys.exit(1)
     print("CTLauncher v1.0 - Initializing...")
     app = CTLauncher()
     app.mainloop()